@@ -1,4 +1,5 @@
 import os
+import multiprocessing
 from flask import Flask
 import logging
 from logging.handlers import RotatingFileHandler
@@ -37,4 +38,11 @@ def create_app():
     from . import api_routes
     app.register_blueprint(api_routes.bp)
 
+    # В процессах-воркерах пула обновления (они заново импортируют модуль запуска) планировщик не нужен.
+    # Поток запускается в каждом воркере gunicorn, но проходы выполняет только один из них (см. SCHEDULER_LOCK_PATH)
+    if app.config.get('REFRESH_SCHEDULER_ENABLED') and multiprocessing.parent_process() is None:
+        from .services.core.refresh_scheduler import RefreshScheduler
+        RefreshScheduler().start()
+        app.logger.info('Фоновый планировщик обновления расписаний запущен')
+
     return app
\ No newline at end of file
@@ -1,16 +1,45 @@
 # app/api_routes.py
 
+import json
 import logging
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 
+from config import Config
+from . import view_fragments
 from .services.clients import time_service
-from .services.core import cache_manager
+from .services.core import cache_manager, day_views, display_state, view_events
+from .services.core.api_payloads import get_prepared_payload, PreparedPayload
 
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 log = logging.getLogger(__name__)
 
 
+def _payload_response(payload: PreparedPayload) -> Response:
+    """
+    Отдает заранее подготовленное тело с сильным ETag.
+    На If-None-Match с той же версией отвечает 304, иначе - уже сжатое тело.
+    """
+    if request.if_none_match.contains_weak(payload.etag):
+        response = Response(status=304)
+    else:
+        accept = request.accept_encodings
+        if payload.br_body is not None and accept['br']:
+            response = Response(payload.br_body, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'br'
+        elif accept['gzip']:
+            response = Response(payload.gzip_body, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(payload.body, mimetype='application/json')
+
+    response.set_etag(payload.etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Клиент может хранить ответ, но обязан перепроверять его по ETag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 @bp.route('/schedule/<schedule_name>')
 def get_schedule(schedule_name):
     """Отдает актуальное на сегодня расписание в JSON."""
@@ -20,21 +49,104 @@ def get_schedule(schedule_name):
     if all_data.get("error"):
         return jsonify({"error": "Failed to get schedule data"}), 500
 
-    schedule_to_send = all_data.get("schedule")
+    # Обычная или сокращенная сетка звонков - по сегодняшней дате
+    time_info = time_service.get_current_day_and_time()
+    day_type = cache_manager.get_day_type_for_date(all_data, time_info.date_str_iso)
+    schedule_part = day_views.SCHEDULE_KEYS[day_type].schedule
+    # Неделя собирается только если готового тела ответа для этой версии кэша еще нет
+    payload = get_prepared_payload(schedule_name, schedule_part, all_data,
+                                   build=lambda: day_views.get_week_schedule(schedule_name, all_data, day_type))
 
     log.info(f"API: Расписание '{schedule_name}' успешно отправлено.")
-    return jsonify(schedule_to_send)
+    return _payload_response(payload)
 
 
 @bp.route('/consultations/<schedule_name>')
 def get_consultations(schedule_name):
-    """Отдает расписание консультаций из кэша."""
+    """Отдает расписание консультаций из кэша (время окончания - по сегодняшней сетке звонков)."""
     log.info(f"API request for consultations: '{schedule_name}'")
 
     all_data = cache_manager.get_schedule_data(schedule_name)
     if all_data.get("error"):
         return jsonify({"error": "Failed to get consultations data"}), 500
 
-    consultations = all_data.get("consultations")
+    time_info = time_service.get_current_day_and_time()
+    day_type = cache_manager.get_day_type_for_date(all_data, time_info.date_str_iso)
+    payload = get_prepared_payload(schedule_name, day_views.SCHEDULE_KEYS[day_type].consultations, all_data)
     log.info(f"API: Консультации для '{schedule_name}' успешно отправлены.")
-    return jsonify(consultations)
\ No newline at end of file
+    return _payload_response(payload)
+
+
+@bp.route('/view/<schedule_name>')
+def get_view(schedule_name):
+    """
+    Версионированное состояние ландшафтного экрана.
+    ?since=<версия> - версия, которую показывает клиент. Если она актуальна, отвечает {"changed": false};
+    если изменились только видимые слайды (или консультации) того же дня - отдает появившиеся слайды
+    и ключи исчезнувших; иначе (новые данные, другой день) - тело страницы целиком.
+    """
+    if schedule_name not in Config.SCHEDULES:
+        return jsonify({"error": "Schedule not found"}), 404
+
+    all_data = cache_manager.get_schedule_data(schedule_name)
+    if all_data.get("error"):
+        return jsonify({"error": "Failed to get schedule data"}), 500
+
+    time_info = time_service.get_current_day_and_time()
+    state = display_state.get_display_state(schedule_name, all_data, time_info)
+    if state is None:
+        return jsonify({"error": "Cache data is corrupted"}), 500
+
+    view = view_fragments.build_view_update(schedule_name, state, request.args.get('since'), time_info)
+    if "patch" in view:
+        log.info(f"API: Экран '{schedule_name}': +{len(view['patch']['added'])} / "
+                 f"-{len(view['patch']['removed'])} слайдов.")
+    elif "html" in view:
+        log.info(f"API: Экран '{schedule_name}': тело страницы отправлено целиком.")
+
+    response = jsonify(view)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@bp.route('/events/<schedule_name>')
+def get_events(schedule_name):
+    """
+    Поток Server-Sent Events для экранов-киосков. Событие "view" (тело - как у /api/view) приходит при
+    публикации нового кэша и на границах таймлайна показа; id события - версия состояния экрана.
+    При переподключении браузер присылает Last-Event-ID, и первым событием приходит разница с этой версией.
+    Между событиями - heartbeat-комментарии. Каждое подключение занимает поток (Gunicorn: gthread),
+    поэтому канал работает только при Config.VIEW_EVENTS_ENABLED.
+    """
+    if schedule_name not in Config.SCHEDULES:
+        return jsonify({"error": "Schedule not found"}), 404
+
+    if not Config.VIEW_EVENTS_ENABLED:
+        # Синхронный воркер был бы занят экраном целиком - клиент перейдет на опрос /api/view
+        return jsonify({"error": "Event stream is disabled"}), 503
+
+    if view_events.subscribe(schedule_name) is None:
+        # Клиент перейдет на опрос /api/view
+        return jsonify({"error": "Event stream is unavailable"}), 503
+
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    log.info(f"API: Экран подключился к событиям '{schedule_name}'.")
+
+    def stream(version):
+        yield f"retry: {Config.VIEW_EVENTS_CHECK_INTERVAL * 1000}\n\n"
+        while True:
+            state = view_events.wait_for_change(schedule_name, version, Config.VIEW_EVENTS_HEARTBEAT)
+            if state is None:
+                yield ": heartbeat\n\n"
+                continue
+            view = view_fragments.build_view_update(schedule_name, state, version,
+                                                    time_service.get_current_day_and_time())
+            version = state.version
+            yield f"id: {version}\nevent: view\ndata: {json.dumps(view, ensure_ascii=False)}\n\n"
+
+    response = Response(stream_with_context(stream(since)), mimetype='text/event-stream')
+    # Подписка снимается, когда сервер закрывает ответ (клиент отключился или воркер останавливается)
+    response.call_on_close(lambda: view_events.unsubscribe(schedule_name))
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -4,9 +4,9 @@ import logging
 from flask import Blueprint, render_template, abort, redirect, url_for
 from config import Config
 
-# Импортируем наш новый сервис фильтрации
+from . import view_fragments
 from .services.clients import time_service
-from .services.core import view_filter, cache_manager
+from .services.core import cache_manager, display_state
 
 log = logging.getLogger(__name__)
 bp = Blueprint('main', __name__)
@@ -33,37 +33,29 @@ def index(schedule_name):
 
     time_info = time_service.get_current_day_and_time()
 
-    full_schedule = all_data.get("schedule")
-    all_consultations = all_data.get("consultations")
-
-    if not full_schedule or not all_consultations:
+    # --- 4. СОСТОЯНИЕ ЭКРАНА: ВИДИМЫЕ НА ТЕКУЩИЙ МОМЕНТ СЛАЙДЫ И КОНСУЛЬТАЦИИ ---
+    state = display_state.get_display_state(schedule_name, all_data, time_info)
+    if state is None:
         return render_template('error.html', message="Данные в кэше повреждены.",
                                logo_path=Config.LOGO_FILE_PATH), 500
 
-    # --- 4. ФИЛЬТРАЦИЯ ДАННЫХ ЧЕРЕЗ НОВЫЙ СЕРВИС ---
-    schedule_for_today = full_schedule.get(time_info.day_name, {})
-
-    # Один вызов вместо 50 строк кода
-    filtered_schedule = view_filter.filter_schedule_for_display(schedule_for_today, time_info)
-
-    # И второй вызов для консультаций
-    raw_consultations = all_consultations.get(time_info.day_name, [])
-    consultations_for_today = view_filter.filter_consultations_for_display(raw_consultations, time_info)
-
-    lessons_are_over = not filtered_schedule.get("landscape_slides") and not consultations_for_today
+    # --- 5. ТЕЛО РАСПИСАНИЯ: ИЗ КЭША ФРАГМЕНТОВ ---
+    # Фрагмент зависит только от данных дня и набора видимых слайдов, а не от текущей секунды
+    schedule_body_html = view_fragments.render_schedule_body(schedule_name, state)
 
-    # --- 5. ОТПРАВКА ДАННЫХ В ШАБЛОН ---
+    # --- 6. ОТПРАВКА ДАННЫХ В ШАБЛОН (рендерится только "шапка" с датой и временем) ---
+    # Версии нужны main.js: дальше страница не перезагружается, а правится по ответам /api/view
     return render_template(
         'index.html',
-        schedule_for_today=filtered_schedule,
-        consultations_for_today=consultations_for_today,
+        schedule_body_html=schedule_body_html,
         active_day_name=time_info.day_name,
         current_date=time_info.date_str_display,
         current_time=time_info.time_obj.strftime('%H:%M:%S'),
-        refresh_interval=Config.CACHE_DURATION,
-        carousel_interval=Config.CAROUSEL_INTERVAL,
+        bell_status=state.bell_status,
+        refresh_interval=Config.VIEW_POLL_INTERVAL,
+        view_events_enabled=Config.VIEW_EVENTS_ENABLED,
+        view_version=state.version,
+        data_version=all_data.get("cache_version"),
         logo_path=Config.LOGO_FILE_PATH,
-        lessons_are_over=lessons_are_over,
-        is_weekend=(time_info.day_name == "Воскресенье"),
         current_schedule_name=schedule_name
-    )
\ No newline at end of file
+    )
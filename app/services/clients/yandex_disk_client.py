@@ -5,7 +5,9 @@ import requests
 import logging
 import os
 import hashlib
+import json
 from enum import Enum, auto
+from threading import Lock
 from typing import Optional
 
 from config import Config
@@ -14,6 +16,13 @@ from app.services.utils.schedule_verification import verify_schedule_file
 
 log = logging.getLogger(__name__)
 
+# Запрашиваем у API только те поля метаданных, которые нужны для сравнения версий
+_META_FIELDS = ["md5", "modified", "revision", "size"]
+
+_client: Optional[yadisk.Client] = None
+_client_pid: Optional[int] = None
+_client_lock = Lock()
+
 
 class UpdateStatus(Enum):
     """Статусы завершения операции обновления файла."""
@@ -34,41 +43,144 @@ def _calculate_md5(file_path: str) -> Optional[str]:
     return hash_md5.hexdigest()
 
 
+class _HashingWriter:
+    """
+    Файловый объект для yadisk.download: пишет данные во временный файл
+    и одновременно считает их MD5, чтобы не перечитывать файл после скачивания.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self._md5 = hashlib.md5()
+
+    def write(self, data: bytes) -> int:
+        self._md5.update(data)
+        return self._file.write(data)
+
+    # yadisk при повторной попытке перематывает файл на начало - в этом случае начинаем хэш заново
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if (offset, whence) != (0, os.SEEK_SET):
+            raise OSError("Поддерживается только перемотка на начало файла.")
+        self._md5 = hashlib.md5()
+        self._file.seek(0)
+        self._file.truncate()
+        return 0
+
+    def hexdigest(self) -> str:
+        return self._md5.hexdigest()
+
+
+def _get_client() -> yadisk.Client:
+    """
+    Возвращает долгоживущий клиент Яндекс.Диска. Его HTTP-сессии (по одной на поток)
+    держат keep-alive соединения, поэтому повторные проверки не открывают новый TLS.
+    После fork клиент пересоздается, чтобы не делить сокеты с родительским процессом.
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = yadisk.Client(token=Config.YANDEX_TOKEN, session="requests")
+            _client_pid = os.getpid()
+        return _client
+
+
+def _fingerprint_path(local_path: str) -> str:
+    return local_path + ".meta.json"
+
+
+def _read_fingerprint(local_path: str) -> Optional[dict]:
+    """Читает сохраненный "отпечаток" удаленного файла, если он соответствует текущему локальному файлу."""
+    try:
+        with open(_fingerprint_path(local_path), 'r', encoding='utf-8') as f:
+            fingerprint = json.load(f)
+        local_stat = os.stat(local_path)
+    except (OSError, ValueError):
+        return None
+
+    # Если локальный файл подменили в обход клиента, отпечатку доверять нельзя
+    if (fingerprint.get('local_size'), fingerprint.get('local_mtime_ns')) != (local_stat.st_size,
+                                                                             local_stat.st_mtime_ns):
+        return None
+    return fingerprint
+
+
+def _write_fingerprint(local_path: str, remote_meta, md5: str) -> None:
+    """Сохраняет md5/modified/revision удаленного файла рядом с локальной копией."""
+    try:
+        local_stat = os.stat(local_path)
+        fingerprint = {
+            'md5': md5,
+            'modified': remote_meta.modified.isoformat() if getattr(remote_meta, 'modified', None) else None,
+            'revision': getattr(remote_meta, 'revision', None),
+            'size': getattr(remote_meta, 'size', None),
+            'local_size': local_stat.st_size,
+            'local_mtime_ns': local_stat.st_mtime_ns,
+        }
+        temp_path = f"{_fingerprint_path(local_path)}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(fingerprint, f, ensure_ascii=False)
+        os.replace(temp_path, _fingerprint_path(local_path))
+    except OSError as e:
+        log.warning(f"Не удалось сохранить отпечаток файла '{local_path}': {e}")
+
+
 def update_schedule_file_if_changed(yandex_path: str, local_path: str) -> UpdateStatus:
     """
     Проверяет MD5-хэш и скачивает файл, только если он изменился.
     Возвращает статус операции (SKIPPED, SUCCESS, FAILED).
     """
-    temp_path = local_path + ".tmp"
+    temp_path = f"{local_path}.{os.getpid()}.tmp"
 
     try:
-        y = yadisk.YaDisk(token=Config.YANDEX_TOKEN)
+        y = _get_client()
 
         # --- Блок проверки MD5 ---
-        remote_meta = y.get_meta(yandex_path)
+        remote_meta = y.get_meta(yandex_path, fields=_META_FIELDS)
         remote_md5 = remote_meta.md5
 
+        # Хэш локального файла берем из сохраненного отпечатка, чтобы не читать файл с диска
+        fingerprint = _read_fingerprint(local_path)
+
         if not os.path.exists(local_path):
             log.warning(f"Локальный файл '{local_path}' не найден. Начинаю принудительное скачивание.")
+        elif remote_md5 and fingerprint:
+            if fingerprint.get('md5') == remote_md5:
+                log.info(f"Хэши для '{yandex_path}' совпадают (по сохраненному отпечатку). Обновление пропущено.")
+                return UpdateStatus.SKIPPED
+            log.warning(f"Хэш '{yandex_path}' изменился. Требуется обновление.")
         elif remote_md5 and remote_md5 == _calculate_md5(local_path):
             log.info(f"Хэши для '{yandex_path}' совпадают. Обновление пропущено.")
+            _write_fingerprint(local_path, remote_meta, remote_md5)
             return UpdateStatus.SKIPPED
         else:
             log.warning(f"Хэши для '{yandex_path}' отличаются или не удалось их сравнить. Требуется обновление.")
 
-        # --- Блок скачивания ---
+        # --- Блок скачивания (MD5 считается прямо во время загрузки) ---
         log.info(f"Подключаюсь к Яндекс.Диску для скачивания '{yandex_path}'...")
-        y.download(yandex_path, temp_path)
+        with open(temp_path, 'wb') as f:
+            writer = _HashingWriter(f)
+            y.download(yandex_path, writer)
+        downloaded_md5 = writer.hexdigest()
         log.info(f"Файл успешно скачан во временное хранилище: {temp_path}")
 
         # --- Блок верификации и замены ---
+        if remote_md5 and downloaded_md5 != remote_md5:
+            log.error(f"MD5 скачанного файла '{yandex_path}' не совпадает с удаленным. Обновление отменено.")
+            return UpdateStatus.FAILED
+
         if not verify_schedule_file(temp_path):
             log.error(f"Скачанный файл '{yandex_path}' не прошел верификацию. Обновление отменено.")
             return UpdateStatus.FAILED
 
-        if os.path.exists(local_path):
-            os.remove(local_path)
-        os.rename(temp_path, local_path)
+        # Атомарная замена: файл по пути local_path существует в любой момент времени
+        os.replace(temp_path, local_path)
+        _write_fingerprint(local_path, remote_meta, downloaded_md5)
 
         log.info(f"Файл '{yandex_path}' успешно скачан и обновлен в '{local_path}'")
         return UpdateStatus.SUCCESS
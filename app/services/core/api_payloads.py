@@ -0,0 +1,71 @@
+# app/services/core/api_payloads.py
+
+import gzip
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from config import Config
+from app.services.utils.lru_cache import LRUCache
+
+try:
+    import brotli  # Необязательная зависимость: без нее отдаем только gzip
+except ImportError:
+    brotli = None
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PreparedPayload:
+    """Готовое тело JSON-ответа API: сериализуется и сжимается один раз на версию кэша."""
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    br_body: Optional[bytes] = None
+
+
+# Ключ - (расписание, часть данных), версия - хэш содержимого кэша
+_payloads = LRUCache(max_size=Config.MEMORY_CACHE_SIZE * 2)
+
+
+def compute_content_hash(data) -> str:
+    """Хэш содержимого, не зависящий от порядка ключей. Используется как версия кэша и ETag."""
+    raw = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def get_prepared_payload(schedule_name: str, part: str, all_data: dict,
+                         build: Optional[Callable[[], object]] = None) -> PreparedPayload:
+    """
+    Возвращает готовое (сериализованное и сжатое) тело ответа для части данных кэша,
+    например "schedule" или "consultations".
+    Если часть не хранится в кэше, а собирается из него, build вызывается только при промахе.
+    """
+    cache_version = all_data.get("cache_version")
+    key = (schedule_name, part)
+
+    if cache_version:
+        payload = _payloads.get(key, cache_version)
+        if payload is not None:
+            return payload
+
+    data = build() if build is not None else all_data.get(part)
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    # Старый кэш без версии: хэшируем само тело
+    version = cache_version or hashlib.sha256(body).hexdigest()[:32]
+
+    payload = PreparedPayload(
+        etag=f"{version}-{part}",
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        br_body=brotli.compress(body) if brotli else None,
+    )
+    log.info(f"Подготовлено тело ответа '{part}' для '{schedule_name}' (версия {version}, {len(body)} байт).")
+
+    if cache_version:
+        _payloads.put(key, payload, cache_version)
+    return payload
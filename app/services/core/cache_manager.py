@@ -1,34 +1,52 @@
 # app/services/core/cache_manager.py
 
-import json
 import logging
 import os
 import time
-from typing import Tuple
-from threading import Lock
+from typing import Callable, List, Optional, Tuple
+from threading import Lock, Thread
 
 from config import Config, BASE_DIR
-from app.utils import make_json_serializable
 
 from .backup_manager import create_backup, clean_old_backups, get_latest_backup_path
+from .incremental_parser import parse_schedule_incremental, parse_consultations_incremental
+from .day_views import SCHEDULE_KEYS, lessons_to_rows
+from .api_payloads import compute_content_hash
+from .cache_serializer import get_cache_serializer, CacheFormatError
 
-from app.services.clients.time_service import get_current_day_and_time
 from app.services.clients.yandex_disk_client import update_schedule_file_if_changed, UpdateStatus
 
 
-from app.services.utils.excel_reader import open_excel_file
+from app.services.utils.bell_schedule import load_timetables, timetables_to_rows
+from app.services.utils.excel_reader import open_workbook, release_workbook
+from app.services.utils.file_lock import FileLock
+from app.services.utils.lru_cache import LRUCache
+from app.services.utils.normalization import get_normalization_stats
 from app.services.utils.schedule_comparator import compare_schedules
 from app.services.utils.enums import DayType
+from app.utils import make_json_serializable
 
 from app.services.parsers.short_day_parser import get_short_days_from_file
-from app.services.parsers.schedule_parser import parse_schedule
-from app.services.parsers.consultation_parser import parse_consultations
-from app.services.parsers.landscape_builder import build_landscape_view
-from app.services.parsers.portrait_builder import build_portrait_view
+from app.services.parsers.consultation_parser import DAYS_ORDER
 
 
 log = logging.getLogger(__name__)
-thread_lock = Lock()
+
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+# Формат файлов кэша на диске: компактный двоичный или JSON для отладки/выгрузки
+cache_serializer = get_cache_serializer(Config.CACHE_FORMAT)
+
+# Уровень кэша в памяти процесса: уже декодированные словари расписаний.
+# Версия записи - "отпечаток" файла кэша на диске, поэтому файл перечитывается только после его изменения.
+_memory_cache = LRUCache(max_size=Config.MEMORY_CACHE_SIZE)
+
+# Расписания, для которых уже запущено фоновое обновление (stale-while-revalidate)
+_background_refreshes = set()
+_background_lock = Lock()
+
+# Подписчики на публикацию нового кэша в этом процессе (см. add_publish_listener)
+_publish_listeners: List[Callable[[str], None]] = []
 
 
 def get_schedule_data(schedule_name: str, force_update: bool = False) -> dict:
@@ -41,61 +59,293 @@ def get_schedule_data(schedule_name: str, force_update: bool = False) -> dict:
     if schedule_name not in Config.SCHEDULES:
         return {"error": "Schedule not found"}
 
-    cache_file = os.path.join(BASE_DIR, 'data', f'{schedule_name}_cache.json')
+    cache_file = get_cache_file_path(schedule_name)
+
+    cache_stat = _stat_cache_file(cache_file)
+    needs_blocking_update = force_update
+    if cache_stat is None:
+        needs_blocking_update = True
+        log.warning(f"Кэш для '{schedule_name}' отсутствует (первичная проверка).")
+    elif not force_update:
+        cache_age = _cache_age(cache_file, cache_stat)
+        if cache_age > Config.CACHE_DURATION:
+            if Config.STALE_WHILE_REVALIDATE and cache_age <= Config.CACHE_MAX_STALENESS:
+                # Отдаем последние хорошие данные сразу, а обновление уходит в фоновый поток
+                _start_background_refresh(schedule_name, cache_file)
+            else:
+                needs_blocking_update = True
+                log.warning(f"Кэш для '{schedule_name}' устарел по времени (первичная проверка).")
+
+    # Единая точка принятия решения
+    if needs_blocking_update:
+        if force_update:
+            log.warning(f"Принудительное обновление кэша для '{schedule_name}' инициировано.")
+
+        success, message = _refresh_cache(schedule_name, cache_file, force_update)
+        if not success:
+            return {"error": message}
+        cache_stat = _stat_cache_file(cache_file)
 
+    # ---> 3. Чтение из памяти или из файла кэша <---
     try:
-        data_dir = os.path.join(BASE_DIR, 'data')
-        os.makedirs(data_dir, exist_ok=True)
+        return _load_cache_file(schedule_name, cache_file, cache_stat)
+    except CacheFormatError as e:
+        if needs_blocking_update:
+            error_message = f"Критическая ошибка: не удалось прочитать файл кэша для '{schedule_name}'. {e}"
+            log.error(error_message)
+            return {"error": error_message}
+        # Кэш записан в другом формате или другой версией: один раз пересобираем его
+        log.warning(f"Файл кэша для '{schedule_name}' не подходит ({e}). Запускаю пересборку.")
+        _discard_cache_file(schedule_name, cache_file, cache_stat)
+        return get_schedule_data(schedule_name, force_update=True)
     except OSError as e:
-        log.critical(f"Критическая ошибка: не удалось создать директорию '{data_dir}': {e}")
-        return {"error": f"Не удалось создать рабочую директорию: {e}"}
+        error_message = f"Критическая ошибка: не удалось прочитать файл кэша для '{schedule_name}'. {e}"
+        log.error(error_message)
+        return {"error": error_message}
 
 
-    is_cache_stale = False
+def refresh_schedule(schedule_name: str) -> Tuple[bool, str]:
+    """
+    Проверяет файл расписания на Яндекс.Диске и при изменении пересобирает кэш,
+    после чего загружает его в память. Используется фоновым планировщиком.
+    Если это расписание уже обновляет другой поток или процесс, проверка пропускается.
+    """
+    cache_file = get_cache_file_path(schedule_name)
+    success, message = _refresh_cache(schedule_name, cache_file, force_update=True, blocking=False)
+    if success:
+        warm_memory_cache(schedule_name)
+    return success, message
+
+
+def warm_memory_cache(schedule_name: str) -> None:
+    """Загружает свежий файл кэша в память процесса, чтобы первый запрос не читал его с диска."""
+    cache_file = get_cache_file_path(schedule_name)
     try:
-        if (time.time() - os.path.getmtime(cache_file)) > Config.CACHE_DURATION:
-            is_cache_stale = True
-            log.warning(f"Кэш для '{schedule_name}' устарел по времени (первичная проверка).")
-    except FileNotFoundError:
-        is_cache_stale = True
-        log.warning(f"Кэш для '{schedule_name}' отсутствует (первичная проверка).")
+        _load_cache_file(schedule_name, cache_file, _stat_cache_file(cache_file))
+    except (CacheFormatError, OSError) as e:
+        log.warning(f"Не удалось прогреть кэш в памяти для '{schedule_name}': {e}")
 
-    # Единая точка принятия решения
-    if is_cache_stale or force_update:
-        if force_update:
-            log.warning(f"Принудительное обновление кэша для '{schedule_name}' инициировано.")
 
-        with thread_lock:
-            # --- ВОТ ГЛАВНОЕ ИСПРАВЛЕНИЕ ---
-            # Повторно проверяем, не обновил ли кто-то кэш, пока мы ждали блокировку.
+def add_publish_listener(listener: Callable[[str], None]) -> None:
+    """
+    Регистрирует функцию, которая вызывается с именем расписания сразу после публикации нового кэша
+    в этом процессе. Публикации из других процессов (планировщик, бот) так не видны -
+    их замечают по изменению файла кэша.
+    """
+    _publish_listeners.append(listener)
+
+
+def get_cache_file_path(schedule_name: str) -> str:
+    """Путь к файлу кэша расписания с учетом выбранного формата."""
+    return os.path.join(DATA_DIR, f'{schedule_name}_cache.{cache_serializer.extension}')
+
+
+def get_schedule_lock(schedule_name: str) -> FileLock:
+    """Межпроцессная блокировка обновления конкретного расписания."""
+    return FileLock(os.path.join(DATA_DIR, f'{schedule_name}.lock'))
+
+
+def is_cache_stale(cache_file: str) -> bool:
+    """Кэш устарел по времени или его еще нет."""
+    cache_stat = _stat_cache_file(cache_file)
+    if cache_stat is None:
+        return True  # Если файла все еще нет, значит, он все еще "устарел"
+    return _cache_age(cache_file, cache_stat) > Config.CACHE_DURATION
+
+
+def _checked_marker_path(cache_file: str) -> str:
+    """Отметка "книга проверена и не менялась": ее время изменения - время последней такой проверки."""
+    return f"{cache_file}.checked"
+
+
+def _cache_age(cache_file: str, cache_stat) -> float:
+    """
+    Сколько секунд назад кэш последний раз подтвержден актуальным: опубликован новый файл
+    или проверено, что книга на Диске не менялась (см. _checked_marker_path).
+    """
+    age = time.time() - cache_stat.st_mtime
+    if age > Config.CACHE_DURATION:
+        # Отметку смотрим, только когда сам файл уже старый: на горячем пути лишнего stat нет
+        try:
+            age = min(age, time.time() - os.path.getmtime(_checked_marker_path(cache_file)))
+        except FileNotFoundError:
+            pass
+    return age
+
+
+def _refresh_cache(schedule_name: str, cache_file: str, force_update: bool = False,
+                   blocking: bool = True) -> Tuple[bool, str]:
+    """
+    Обновляет кэш под межпроцессной блокировкой конкретного расписания,
+    повторно проверяя его "свежесть" после ее получения.
+    При blocking=False обновление пропускается, если его уже выполняет другой поток или процесс.
+    """
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+    except OSError as e:
+        log.critical(f"Критическая ошибка: не удалось создать директорию '{DATA_DIR}': {e}")
+        return False, f"Не удалось создать рабочую директорию: {e}"
+
+    # Блокировка своя для каждого расписания: разные расписания обновляются параллельно,
+    # а одно и то же - ровно одним воркером gunicorn.
+    schedule_lock = get_schedule_lock(schedule_name)
+    if not schedule_lock.acquire(blocking=blocking):
+        log.info(f"Кэш для '{schedule_name}' уже обновляется другим процессом. Обновление пропущено.")
+        return True, "Обновление уже выполняется."
+
+    try:
+        # --- ВОТ ГЛАВНОЕ ИСПРАВЛЕНИЕ ---
+        # Повторно проверяем, не обновил ли кто-то кэш, пока мы ждали блокировку.
+        if force_update or is_cache_stale(cache_file):
+            log.info(f"Блокировка получена. Начинаю обновление кэша для '{schedule_name}'.")
+            return _update_cache_file(schedule_name, cache_file)
+
+        log.info(f"Блокировка получена, но кэш уже обновлен другим процессом. Обновление пропущено.")
+        return True, "Кэш уже актуален."
+    finally:
+        schedule_lock.release()
+
+
+def _discard_cache_file(schedule_name: str, cache_file: str, unreadable_stat) -> None:
+    """
+    Удаляет нечитаемый файл кэша, чтобы пересборка разобрала книгу, даже если файл на Диске
+    не менялся (иначе обновление только отметило бы старый файл проверенным). Удаляется только тот самый файл:
+    если другой процесс успел опубликовать новый кэш, он остается.
+    """
+    with get_schedule_lock(schedule_name):
+        current_stat = _stat_cache_file(cache_file)
+        if current_stat is not None and _file_version(current_stat) == _file_version(unreadable_stat):
             try:
-                is_still_stale = (time.time() - os.path.getmtime(cache_file)) > Config.CACHE_DURATION
+                os.remove(cache_file)
             except FileNotFoundError:
-                is_still_stale = True  # Если файла все еще нет, значит, он все еще "устарел"
+                pass
 
-            if is_still_stale or force_update:
-                log.info(f"Блокировка получена. Начинаю обновление кэша для '{schedule_name}'.")
-                success, message = _update_cache_file(schedule_name, cache_file)
-                if not success:
-                    return {"error": message}
-            else:
-                log.info(f"Блокировка получена, но кэш уже обновлен другим процессом. Обновление пропущено.")
 
-    # ---> 3. Чтение из файла кэша <---
+def _start_background_refresh(schedule_name: str, cache_file: str):
+    """Запускает фоновое обновление кэша, если для этого расписания оно еще не идет."""
+    with _background_lock:
+        if schedule_name in _background_refreshes:
+            return
+        _background_refreshes.add(schedule_name)
+
+    log.info(f"Кэш для '{schedule_name}' устарел. Отдаем текущие данные, обновление запущено в фоне.")
+    Thread(target=_background_refresh, args=(schedule_name, cache_file),
+           name=f"cache-refresh-{schedule_name}", daemon=True).start()
+
+
+def _background_refresh(schedule_name: str, cache_file: str):
     try:
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            log.info(f"Загрузка данных для '{schedule_name}' из файла кэша.")
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        error_message = f"Критическая ошибка: не удалось прочитать файл кэша для '{schedule_name}'. {e}"
-        log.error(error_message)
-        return {"error": error_message}
+        success, message = _refresh_cache(schedule_name, cache_file, blocking=False)
+        if not success:
+            log.error(f"Фоновое обновление кэша для '{schedule_name}' не удалось: {message}")
+    except Exception as e:
+        log.error(f"Непредвиденная ошибка при фоновом обновлении '{schedule_name}': {e}", exc_info=True)
+    finally:
+        with _background_lock:
+            _background_refreshes.discard(schedule_name)
+
+
+def get_day_type_for_date(all_data: dict, date_iso: str) -> DayType:
+    """
+    Выбирает сетку звонков на дату. Сокращенный день - это просто поиск даты
+    в календаре из кэша, без повторного парсинга.
+    """
+    return DayType.SHORT if date_iso in all_data.get("short_days", ()) else DayType.NORMAL
+
+
+def get_memory_cache_stats() -> dict:
+    """Возвращает счетчики попаданий/промахов кэша в памяти."""
+    return _memory_cache.stats()
+
+
+def _stat_cache_file(cache_file: str):
+    """Возвращает os.stat файла кэша или None, если файла нет."""
+    try:
+        return os.stat(cache_file)
+    except FileNotFoundError:
+        return None
+
+
+def _file_version(cache_stat) -> tuple:
+    """"Отпечаток" файла кэша: меняется при каждой публикации нового содержимого."""
+    return cache_stat.st_ino, cache_stat.st_size, cache_stat.st_mtime_ns
+
+
+def _load_cache_file(schedule_name: str, cache_file: str, cache_stat) -> dict:
+    """
+    Отдает декодированные данные из памяти, если файл кэша не менялся,
+    иначе читает файл и кладет результат в память.
+    Бросает CacheFormatError, если файл не удалось декодировать.
+    """
+    if cache_stat is not None:
+        cached_data = _memory_cache.get(schedule_name, _file_version(cache_stat))
+        if cached_data is not None:
+            return cached_data
+
+    with open(cache_file, 'rb') as f:
+        log.info(f"Загрузка данных для '{schedule_name}' из файла кэша.")
+        # Версию берем с открытого дескриптора, чтобы она точно соответствовала прочитанному содержимому
+        file_stat = os.fstat(f.fileno())
+        data = cache_serializer.loads(f.read())
+
+    _memory_cache.put(schedule_name, data, version=_file_version(file_stat))
+    return data
 
 
 def _update_cache_file(schedule_name: str, cache_file: str) -> Tuple[bool, str]:
+    """Внутренняя функция для скачивания, парсинга и сохранения данных в кэш."""
+    success, message, payload = build_cache_artifact(schedule_name, cache_file)
+    if success:
+        publish_cache_artifact(schedule_name, cache_file, payload)
+    return success, message
+
+
+def build_cache_artifact(schedule_name: str, cache_file: str) -> Tuple[bool, str, Optional[bytes]]:
     """
-    Внутренняя функция для скачивания, парсинга и сохранения данных в кэш.
+    Скачивает, проверяет и парсит расписание, но ничего не пишет в кэш:
+    возвращает (успех, сообщение, сериализованный кэш или None, если пересобирать нечего).
+    Может выполняться в отдельном процессе - результат публикует вызывающий (publish_cache_artifact).
+    Книга Excel декодируется один раз за обновление: проверка структуры, сравнение
+    с бэкапом и все парсеры читают листы из одной WorkbookSession.
+    """
+    local_path = Config.SCHEDULES[schedule_name]['local_path']
+    backup_path = get_latest_backup_path(schedule_name, local_path)
+    try:
+        return _download_and_rebuild_cache(schedule_name, cache_file)
+    finally:
+        # Декодированные книги больше не нужны - не держим их в памяти до следующего обновления
+        release_workbook(local_path, *([backup_path] if backup_path else []))
+
+
+def publish_cache_artifact(schedule_name: str, cache_file: str, payload: Optional[bytes]) -> None:
     """
+    Атомарно заменяет файл кэша готовым содержимым (через временный файл и os.replace).
+    Без содержимого только отмечает, что кэш проверен и актуален. Сам файл при этом не трогаем:
+    его время изменения входит в версию кэша в памяти, и "освеженный" файл заново декодировали бы все процессы.
+    """
+    if payload is None:
+        marker = _checked_marker_path(cache_file)
+        with open(marker, 'a'):
+            pass
+        os.utime(marker, None)
+        return
+
+    # Имя временного файла уникально для процесса, чтобы воркеры не писали в один и тот же файл
+    temp_cache_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temp_cache_file, 'wb') as f:
+        f.write(payload)
+
+    os.replace(temp_cache_file, cache_file)
+    log.info(f"Кэш для '{schedule_name}' успешно обновлен.")
+
+    for listener in _publish_listeners:
+        try:
+            listener(schedule_name)
+        except Exception as e:
+            log.error(f"Ошибка в обработчике публикации кэша для '{schedule_name}': {e}", exc_info=True)
+
+
+def _download_and_rebuild_cache(schedule_name: str, cache_file: str) -> Tuple[bool, str, Optional[bytes]]:
     schedule_config = Config.SCHEDULES[schedule_name]
     yandex_path = schedule_config['yandex_path']
     local_path = schedule_config['local_path']
@@ -109,9 +359,8 @@ def _update_cache_file(schedule_name: str, cache_file: str) -> Tuple[bool, str]:
     if update_status == UpdateStatus.SKIPPED:
         # Теперь ПРОВЕРЯЕМ, нужно ли нам что-то делать.
         if os.path.exists(cache_file):
-            # Если кэш ЕСТЬ, то делать ничего не нужно. Просто "освежаем" его и выходим.
-            os.utime(cache_file, None)
-            return True, "Удаленный файл не изменился. Обновление кэша пропущено."
+            # Если кэш ЕСТЬ, то делать ничего не нужно. Просто отмечаем, что он проверен, и выходим.
+            return True, "Удаленный файл не изменился. Обновление кэша пропущено.", None
         else:
             # А вот и наш случай! Файл Excel не менялся, но кэша нет.
             # Мы обязаны его создать.
@@ -136,7 +385,8 @@ def _update_cache_file(schedule_name: str, cache_file: str) -> Tuple[bool, str]:
 
             # Сравниваем новый файл с последним бэкапом
             if latest_backup_path:
-                changes = compare_schedules(old_file_path=latest_backup_path, new_file_path=local_path)
+                changes = compare_schedules(old_file_path=latest_backup_path, new_file_path=local_path,
+                                            new_workbook=open_workbook(local_path))
                 if changes:
                     log.warning(f"Обнаружены изменения в расписании '{schedule_name}': {changes}")
         except Exception as e:
@@ -151,23 +401,19 @@ def _update_cache_file(schedule_name: str, cache_file: str) -> Tuple[bool, str]:
         else:
             msg = f"Критическая ошибка: не удалось ни обновить, ни найти локальный файл для '{schedule_name}'."
             log.critical(msg)
-            return False, msg  # Здесь точно выходим, парсить нечего
+            return False, msg, None  # Здесь точно выходим, парсить нечего
 
     # --- ШАГ 3: ПАРСИНГ ЛОКАЛЬНОГО ФАЙЛА (нового или старого) ---
     log.info(f"Парсинг всех данных для '{schedule_name}'...")
     all_data = _parse_all_data(schedule_name)
     if all_data.get("error"):
-        return False, all_data["error"]
+        return False, all_data["error"], None
 
-    # --- ШАГ 4: СОХРАНЕНИЕ В КЭШ ---
-    temp_cache_file = cache_file + ".tmp"
-    with open(temp_cache_file, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    # Хэш содержимого считается один раз при записи и служит версией кэша (в т.ч. ETag для API)
+    all_data["cache_version"] = compute_content_hash(all_data)
 
-    os.replace(temp_cache_file, cache_file)
-    msg = f"Кэш для '{schedule_name}' успешно обновлен."
-    log.info(msg)
-    return True, msg
+    # --- ШАГ 4: ГОТОВИМ СОДЕРЖИМОЕ КЭША (запись - в publish_cache_artifact) ---
+    return True, f"Кэш для '{schedule_name}' успешно обновлен.", cache_serializer.dumps(all_data)
 
 def _parse_all_data(schedule_name: str) -> dict:
     """Парсит и уроки, и консультации, собирая финальную структуру для кэша."""
@@ -179,42 +425,42 @@ def _parse_all_data(schedule_name: str) -> dict:
 
     log.info(f"Открываем файл '{local_path}' ОДИН РАЗ для всех парсеров.")
 
-    xls = open_excel_file(local_path)
+    xls = open_workbook(local_path)
     if not xls:
         error_msg = f"Не удалось открыть Excel файл через excel_reader: {local_path}"
         log.error(error_msg)
         return {"error": error_msg}
 
     try:
-        # Передаем ОТКРЫТЫЙ ФАЙЛ в парсеры
+        # Передаем ОТКРЫТЫЙ ФАЙЛ в парсеры.
+        # Тип дня здесь не выбирается: в кэш попадают обе сетки звонков и календарь сокращенных дней,
+        # а нужный вариант выбирается при запросе (см. get_day_type_for_date).
         short_days_list = get_short_days_from_file(xls)
-        current_time_info = get_current_day_and_time()
-        is_short_day_today = current_time_info.date_str_iso in short_days_list
-
-        day_type_for_parser = DayType.SHORT if is_short_day_today else DayType.NORMAL
-        log.info(f"Определен тип дня для парсинга: '{day_type_for_parser.name}'")
-
-        raw_lessons = parse_schedule(xls, day_type_override=day_type_for_parser)
-        consultations = parse_consultations(xls)
-
-        # 3. Собираем финальные структуры данных, как они были раньше
-        schedule_normal = {}
-        schedule_short = {}
-        days_order = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота"]
 
-        schedule = {}
-        for day in days_order:
-            daily_lessons = raw_lessons.get(day, [])
-            schedule[day] = {
-                "portrait_view": build_portrait_view(daily_lessons),
-                "landscape_slides": build_landscape_view(daily_lessons)
-            }
+        # Сетки звонков: встроенные, если в книге нет своих листов звонков
+        timetables = load_timetables(xls)
+
+        # Заново разбираются только листы, содержимое которых изменилось с прошлого обновления
+        lessons_by_day_type = parse_schedule_incremental(schedule_name, xls, tuple(SCHEDULE_KEYS), timetables)
+        consultations_by_day_type = parse_consultations_incremental(schedule_name, xls, tuple(SCHEDULE_KEYS),
+                                                                    timetables)
+
+        # 3. В кэш попадают только уроки и консультации. Представления дней (portrait/landscape, таймлайн)
+        # строятся из них при первом запросе дня (см. day_views.get_day_view).
+        # Отпечаток дня - версия его представления: меняется, только если изменились уроки или консультации дня.
+        # Сетки звонков нужны и экрану (идущий и следующий урок, см. view_filter.describe_bells).
+        all_data = {"short_days": sorted(short_days_list), "bells": timetables_to_rows(timetables), "day_versions": {}}
+        for day_type, keys in SCHEDULE_KEYS.items():
+            consultations = make_json_serializable(consultations_by_day_type[day_type])
+            all_data[keys.consultations] = consultations
+            all_data[keys.lessons], all_data["day_versions"][keys.lessons] = {}, {}
+            for day in DAYS_ORDER:
+                rows = lessons_to_rows(lessons_by_day_type[day_type].get(day, []))
+                all_data[keys.lessons][day] = rows
+                all_data["day_versions"][keys.lessons][day] = compute_content_hash([rows, consultations[day]])
 
     finally:
-        # Этот блок гарантирует, что файл будет закрыт, даже если при парсинге произойдет ошибка
-        xls.close()
+        log.info(f"Статистика чтения книги '{local_path}': {xls.stats()}")
+        log.debug(f"Статистика кэшей нормализации ячеек: {get_normalization_stats()}")
 
-    return make_json_serializable({
-        "schedule": schedule,
-        "consultations": consultations,
-    })
\ No newline at end of file
+    return all_data
\ No newline at end of file
@@ -0,0 +1,100 @@
+# app/services/core/cache_serializer.py
+
+import json
+import marshal
+import struct
+import sys
+from typing import Any
+
+# Версия схемы данных кэша. Увеличивается при несовместимом изменении структуры,
+# после чего старые файлы кэша считаются недействительными и пересобираются.
+CACHE_SCHEMA_VERSION = 4
+
+
+class CacheFormatError(ValueError):
+    """Файл кэша записан в другом формате, другой версией схемы или поврежден."""
+
+
+class JsonCacheSerializer:
+    """
+    Текстовый формат: удобен для отладки и выгрузки, но медленнее и объемнее.
+    Данные лежат в "конверте" {"schema": версия схемы, "data": ...}: файл старой схемы
+    (или без конверта) не принимается и пересобирается так же, как в двоичном формате.
+    """
+    name = 'json'
+    extension = 'json'
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps({"schema": CACHE_SCHEMA_VERSION, "data": data}, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def loads(self, raw: bytes) -> dict:
+        try:
+            envelope = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise CacheFormatError(f"Некорректный JSON в файле кэша: {e}") from e
+        if not isinstance(envelope, dict) or "schema" not in envelope or "data" not in envelope:
+            raise CacheFormatError("Файл кэша записан без версии схемы.")
+        if envelope["schema"] != CACHE_SCHEMA_VERSION:
+            raise CacheFormatError(f"Файл кэша записан другой версией (схема {envelope['schema']}).")
+        return envelope["data"]
+
+
+class BinaryCacheSerializer:
+    """
+    Компактный двоичный формат на основе marshal.
+    Перед записью одинаковые строки ('предмет', 'кабинет', названия предметов, время)
+    сводятся к одному объекту, и marshal сохраняет каждую из них только один раз,
+    а дальше ссылается на нее - по сути, таблица строк.
+
+    Заголовок: сигнатура, версия схемы, версия marshal и версия Python,
+    так как формат marshal не гарантирован между версиями интерпретатора.
+    """
+    name = 'binary'
+    extension = 'bin'
+
+    MAGIC = b'L22C'
+    _HEADER = struct.Struct('>4sHBBB')
+
+    def dumps(self, data: dict) -> bytes:
+        header = self._HEADER.pack(self.MAGIC, CACHE_SCHEMA_VERSION, marshal.version, *sys.version_info[:2])
+        return header + marshal.dumps(_intern_strings(data), marshal.version)
+
+    def loads(self, raw: bytes) -> dict:
+        if len(raw) < self._HEADER.size:
+            raise CacheFormatError("Файл кэша слишком короткий.")
+        magic, schema_version, marshal_version, py_major, py_minor = self._HEADER.unpack_from(raw)
+        if magic != self.MAGIC:
+            raise CacheFormatError("Неизвестная сигнатура файла кэша.")
+        if (schema_version, marshal_version, py_major, py_minor) != (
+                CACHE_SCHEMA_VERSION, marshal.version, *sys.version_info[:2]):
+            raise CacheFormatError(
+                f"Файл кэша записан другой версией (схема {schema_version}, Python {py_major}.{py_minor}).")
+        try:
+            return marshal.loads(memoryview(raw)[self._HEADER.size:])
+        except (EOFError, ValueError, TypeError) as e:
+            raise CacheFormatError(f"Файл кэша поврежден: {e}") from e
+
+
+_SERIALIZERS = {
+    JsonCacheSerializer.name: JsonCacheSerializer,
+    BinaryCacheSerializer.name: BinaryCacheSerializer,
+}
+
+
+def get_cache_serializer(name: str):
+    """Возвращает сериализатор кэша по имени формата ('binary' или 'json')."""
+    try:
+        return _SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Неизвестный формат кэша '{name}'. Допустимые: {', '.join(_SERIALIZERS)}")
+
+
+def _intern_strings(data: Any) -> Any:
+    """Рекурсивно заменяет все строки на интернированные, чтобы одинаковые значения были одним объектом."""
+    if isinstance(data, str):
+        return sys.intern(data)
+    if isinstance(data, dict):
+        return {sys.intern(k) if isinstance(k, str) else k: _intern_strings(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_intern_strings(i) for i in data]
+    return data
@@ -0,0 +1,113 @@
+# app/services/core/day_views.py
+
+import logging
+from typing import Dict, List, NamedTuple, Tuple
+
+from config import Config
+from app.utils import make_json_serializable
+
+from .view_filter import build_display_timeline
+
+from app.services.utils.bell_schedule import BellTimetable, timetables_from_rows
+from app.services.utils.enums import DayType, Shift
+from app.services.utils.lru_cache import LRUCache
+from app.services.utils.normalization import parse_time_str
+
+from app.services.parsers.common_structs import RawLesson
+from app.services.parsers.consultation_parser import DAYS_ORDER
+from app.services.parsers.landscape_builder import build_landscape_view
+from app.services.parsers.portrait_builder import build_portrait_view
+
+
+log = logging.getLogger(__name__)
+
+class ScheduleKeys(NamedTuple):
+    lessons: str  # Уроки дня строками (см. lessons_to_rows)
+    schedule: str  # Имя собранной из них части данных для API
+    consultations: str  # Консультации: время окончания тоже зависит от сетки звонков
+
+
+# Ключи кэша для каждой сетки звонков
+SCHEDULE_KEYS = {
+    DayType.NORMAL: ScheduleKeys("lessons", "schedule", "consultations"),
+    DayType.SHORT: ScheduleKeys("lessons_short", "schedule_short", "consultations_short"),
+}
+
+# Собранные представления дней: ключ - (расписание, день, тип дня), версия - отпечаток уроков
+# и консультаций этого дня из кэша. Дни строятся только при первом запросе.
+_day_views = LRUCache(max_size=Config.MEMORY_CACHE_SIZE * 12)
+
+# Сетки звонков смен, которые учатся в этот день: ключ - (расписание, день, тип дня), версия - версия кэша
+_day_bells = LRUCache(max_size=Config.MEMORY_CACHE_SIZE * 12)
+
+
+def lessons_to_rows(lessons: List[RawLesson]) -> List[list]:
+    """
+    Уроки дня в компактном виде для кэша. Это единственный источник данных для представлений:
+    объекты time и день недели не хранятся - они однозначно восстанавливаются при сборке.
+    """
+    return [[l.class_name, l.shift.value, l.lesson_number, l.display_time, l.subject, l.cabinet,
+             l.start_time, l.end_time] for l in lessons]
+
+
+def _lessons_from_rows(day: str, rows: List[list]) -> List[RawLesson]:
+    shifts = {shift.value: shift for shift in Shift}
+    return [
+        RawLesson(day_name=day, class_name=class_name, shift=shifts[shift], lesson_number=lesson_number,
+                  display_time=display_time, subject=subject, cabinet=cabinet,
+                  start_time=start_time, end_time=end_time,
+                  start_time_obj=parse_time_str(start_time) if start_time else None,
+                  end_time_obj=parse_time_str(end_time) if end_time else None)
+        for class_name, shift, lesson_number, display_time, subject, cabinet, start_time, end_time in rows
+    ]
+
+
+def get_day_view(schedule_name: str, all_data: dict, day: str, day_type: DayType) -> Tuple[dict, dict]:
+    """
+    Представление одного дня: (расписание дня с portrait_view/landscape_slides, таймлайн показа).
+    Строится из уроков кэша при первом запросе и запоминается, пока уроки и консультации дня не изменятся.
+    """
+    keys = SCHEDULE_KEYS[day_type]
+    version = all_data.get("day_versions", {}).get(keys.lessons, {}).get(day)
+    key = (schedule_name, day, day_type)
+    if version is not None:
+        cached = _day_views.get(key, version)
+        if cached is not None:
+            return cached
+
+    lessons = _lessons_from_rows(day, all_data.get(keys.lessons, {}).get(day, []))
+    schedule_day = make_json_serializable({
+        "portrait_view": build_portrait_view(lessons),
+        "landscape_slides": build_landscape_view(lessons)
+    })
+    day_view = (schedule_day, build_display_timeline(schedule_day, all_data.get(keys.consultations, {}).get(day, [])))
+    if version is not None:
+        _day_views.put(key, day_view, version)
+    log.info(f"Собрано представление дня '{day}' ({day_type.name}) для '{schedule_name}'.")
+    return day_view
+
+
+def get_day_bells(schedule_name: str, all_data: dict, day: str, day_type: DayType) -> Dict[Shift, BellTimetable]:
+    """Сетки звонков (из кэша - с листов звонков книги или встроенные) для смен, у которых в этот день есть уроки."""
+    version = all_data.get("cache_version")
+    key = (schedule_name, day, day_type)
+    if version is not None:
+        cached = _day_bells.get(key, version)
+        if cached is not None:
+            return cached
+
+    day_shifts = {row[1] for row in all_data.get(SCHEDULE_KEYS[day_type].lessons, {}).get(day, [])}
+    timetables = timetables_from_rows(all_data.get("bells")).get(day_type, {})
+    day_bells = {shift: timetables[shift] for shift in Shift if shift.value in day_shifts and shift in timetables}
+    if version is not None:
+        _day_bells.put(key, day_bells, version)
+    return day_bells
+
+
+def get_week_schedule(schedule_name: str, all_data: dict, day_type: DayType) -> Dict[str, dict]:
+    """Расписание на всю неделю (для API): представления всех дней, каждый - через get_day_view."""
+    return {day: get_day_view(schedule_name, all_data, day, day_type)[0] for day in DAYS_ORDER}
+
+
+def get_day_views_stats() -> dict:
+    return _day_views.stats()
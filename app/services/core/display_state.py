@@ -0,0 +1,111 @@
+# app/services/core/display_state.py
+
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from config import Config
+from . import cache_manager, day_views, view_filter
+
+from app.services.utils.enums import DayType
+from app.services.utils.lru_cache import LRUCache
+
+
+# Ключ слайда с консультациями (слайды с уроками называются по своим группам классов)
+CONSULTATIONS_SLIDE_KEY = "consultations"
+
+# Недавние состояния экрана по версии: по ним ответ на ?since=<версия> считается как разница слайдов
+_states = LRUCache(max_size=Config.FRAGMENT_CACHE_SIZE)
+
+
+@dataclass(slots=True)
+class DisplayState:
+    """
+    То, что сейчас показывает ландшафтный экран: видимые слайды и консультации сегодняшнего дня.
+    Меняется только при обновлении кэша, смене дня или на границах таймлайна показа.
+    """
+    version: str
+    key: tuple  # (версия кэша, день, тип дня, ключи слайдов) - от него зависит HTML тела страницы
+    day_name: str
+    day_type: DayType
+    schedule_for_today: dict
+    consultations_for_today: list
+    slide_keys: Tuple[str, ...]  # Ключи всех видимых слайдов по порядку, включая слайд консультаций
+    lessons_are_over: bool
+    is_weekend: bool
+    bell_status: str  # Идущий и следующий урок по звонкам (шапка экрана, в тело не входит)
+
+    @property
+    def base(self) -> tuple:
+        """Версия кэша, день и тип дня: при одинаковой базе слайды с одним ключом совпадают."""
+        return self.key[:3]
+
+    @property
+    def data_version(self) -> str:
+        """Версия кэша расписания: при ее смене клиенту нужны и свежие данные для портретного режима."""
+        return self.key[0]
+
+
+def slide_key(slide_group: list) -> str:
+    """Ключ слайда с уроками: группы классов на нем ('10-е классы (1)|11-е классы (1)')."""
+    return "|".join(grade_data.get('grade_key', '') for grade_data in slide_group)
+
+
+def get_display_state(schedule_name: str, all_data: dict, time_info: object) -> Optional[DisplayState]:
+    """
+    Состояние экрана на момент time_info. Возвращает None, если в кэше нет нужных данных.
+    Версия - короткий отпечаток ключа состояния и строки звонков; состояние запоминается для ответов с ?since.
+    """
+    # Сетка звонков (обычная или сокращенная) выбирается по сегодняшней дате
+    day_type = cache_manager.get_day_type_for_date(all_data, time_info.date_str_iso)
+    keys = day_views.SCHEDULE_KEYS[day_type]
+    all_consultations = all_data.get(keys.consultations)
+    if keys.lessons not in all_data or not all_consultations:
+        return None
+
+    # Строится только сегодняшний день (один раз, пока его уроки не изменятся)
+    if time_info.day_name in all_data[keys.lessons]:
+        schedule_for_today, timeline_for_today = day_views.get_day_view(schedule_name, all_data,
+                                                                        time_info.day_name, day_type)
+    else:
+        schedule_for_today, timeline_for_today = {}, None
+
+    filtered_schedule = view_filter.filter_schedule_for_display(schedule_for_today, time_info, timeline_for_today)
+    consultations_for_today = view_filter.filter_consultations_for_display(
+        all_consultations.get(time_info.day_name, []), time_info, timeline_for_today)
+
+    slide_keys = tuple(slide_key(slide) for slide in filtered_schedule.get("landscape_slides", []))
+    if consultations_for_today:
+        slide_keys += (CONSULTATIONS_SLIDE_KEY,)
+
+    bell_status = view_filter.describe_bells(
+        day_views.get_day_bells(schedule_name, all_data, time_info.day_name, day_type), time_info.time_obj)
+
+    key = (all_data.get("cache_version"), time_info.day_name, day_type, slide_keys)
+    version = hashlib.blake2b(repr((key, bell_status)).encode('utf-8'), digest_size=8).hexdigest()
+    state = DisplayState(
+        version=version, key=key, day_name=time_info.day_name, day_type=day_type,
+        schedule_for_today=filtered_schedule, consultations_for_today=consultations_for_today,
+        slide_keys=slide_keys, lessons_are_over=not slide_keys,
+        is_weekend=(time_info.day_name == "Воскресенье"), bell_status=bell_status,
+    )
+    _states.put((schedule_name, version), state)
+    return state
+
+
+def get_previous_state(schedule_name: str, version: str) -> Optional[DisplayState]:
+    """Ранее отданное состояние по версии (None, если версия неизвестна или уже вытеснена)."""
+    return _states.get((schedule_name, version))
+
+
+def can_patch(previous: Optional[DisplayState], state: DisplayState) -> bool:
+    """
+    Можно ли перевести экран из previous в state заменой отдельных слайдов.
+    Нужны те же данные и день, и карусель в обоих состояниях (иначе меняется разметка вокруг нее).
+    """
+    return (previous is not None and previous.base == state.base
+            and bool(previous.slide_keys) and bool(state.slide_keys))
+
+
+def get_display_state_stats() -> dict:
+    return _states.stats()
@@ -0,0 +1,34 @@
+# app/services/core/fragment_cache.py
+
+import logging
+from typing import Callable, Hashable
+
+from markupsafe import Markup
+
+from config import Config
+from app.services.utils.lru_cache import LRUCache
+
+
+log = logging.getLogger(__name__)
+
+# Готовые HTML-фрагменты страницы. Набор видимых групп меняется несколько раз в день,
+# поэтому в установившемся режиме страница - это поиск в словаре и рендер маленькой "шапки".
+_fragments = LRUCache(max_size=Config.FRAGMENT_CACHE_SIZE)
+
+
+def get_or_render(key: Hashable, render: Callable[[], str]) -> Markup:
+    """
+    Возвращает фрагмент по ключу, а при промахе рендерит его и запоминает.
+    Ключ должен включать все, от чего зависит фрагмент (версию кэша, день, видимые группы и т.д.).
+    """
+    fragment = _fragments.get(key)
+    if fragment is None:
+        fragment = Markup(render())
+        _fragments.put(key, fragment)
+        log.info(f"Отрендерен HTML-фрагмент страницы ({len(fragment)} символов).")
+    return fragment
+
+
+def get_fragment_cache_stats() -> dict:
+    """Счетчики попаданий/промахов кэша HTML-фрагментов."""
+    return _fragments.stats()
@@ -0,0 +1,122 @@
+# app/services/core/incremental_parser.py
+
+import logging
+from typing import Callable, Dict, Iterable, List
+
+from config import Config
+
+from app.services.utils.bell_schedule import Timetables, TIMETABLES, timetables_to_rows
+from app.services.utils.enums import DayType
+from app.services.utils.excel_reader import WorkbookSession, SheetGrid
+from app.services.utils.lru_cache import LRUCache
+
+from app.services.parsers.common_structs import RawLesson
+from app.services.parsers.schedule_parser import find_schedule_layout, parse_schedule_sheet_variants, merge_lessons_by_day
+from app.services.parsers.consultation_parser import (
+    Consultation, is_consultation_sheet, find_consultation_layout, parse_consultation_sheet, sort_consultations, DAYS_ORDER
+)
+
+
+log = logging.getLogger(__name__)
+
+# Сетки звонков, для которых расписание собирается заранее; нужная выбирается при запросе
+DAY_TYPES = (DayType.NORMAL, DayType.SHORT)
+
+# Промежуточные результаты по листам: раскладка колонок и разобранные уроки/консультации.
+# Версия записи - отпечаток содержимого листа и сетки звонков книги (для раскладки - заголовок листа),
+# поэтому при обновлении файла заново разбираются только изменившиеся листы.
+_sheet_results = LRUCache(max_size=Config.MEMORY_CACHE_SIZE * 64)
+
+
+def export_sheet_results(schedule_name: str) -> list:
+    """
+    Промежуточные результаты одного расписания [(ключ, значение, версия)] - для передачи в процесс,
+    который будет его разбирать, и обратно (см. refresh_orchestrator).
+    """
+    return [entry for entry in _sheet_results.items() if entry[0][0] == schedule_name]
+
+
+def import_sheet_results(entries: list) -> None:
+    """Принимает результаты, полученные из export_sheet_results другого процесса."""
+    for key, value, version in entries:
+        _sheet_results.put(key, value, version)
+
+
+def _cached_layout(schedule_name: str, kind: str, grid: SheetGrid, find_layout: Callable):
+    """Раскладка колонок листа, пересчитывается только при изменении заголовка."""
+    key = (schedule_name, kind, 'layout', grid.name)
+    version = tuple(grid.columns)
+    cached = _sheet_results.get(key, version)
+    if cached is None:
+        cached = (find_layout(grid),)  # Оборачиваем, чтобы кэшировать и "лист не подходит" (None)
+        _sheet_results.put(key, cached, version)
+    return cached[0]
+
+
+def parse_schedule_incremental(schedule_name: str, xls: WorkbookSession, day_types: Iterable[DayType] = DAY_TYPES,
+                               timetables: Timetables = TIMETABLES) -> Dict[DayType, Dict[str, List[RawLesson]]]:
+    """
+    То же, что parse_schedule, но сразу для нескольких сеток звонков
+    (лист разбирается один раз), а неизменившиеся листы берутся из памяти.
+    timetables - сетки звонков книги (см. load_timetables).
+    """
+    day_types = tuple(day_types)
+    bells = timetables_to_rows(timetables)
+    variants = {day_type: {} for day_type in day_types}
+    reparsed = 0
+
+    for sheet_name in xls.sheet_names:
+        version = (xls.sheet_fingerprint(sheet_name), bells)
+        key = (schedule_name, 'schedule', sheet_name, day_types)
+        sheet_variants = _sheet_results.get(key, version)
+        if sheet_variants is None:
+            grid = xls.sheet(sheet_name)
+            class_column_pairs = _cached_layout(schedule_name, 'schedule', grid, find_schedule_layout)
+            sheet_variants = (parse_schedule_sheet_variants(grid, class_column_pairs, day_types, timetables)
+                              if class_column_pairs else {day_type: {} for day_type in day_types})
+            _sheet_results.put(key, sheet_variants, version)
+            reparsed += 1
+
+        for day_type, sheet_lessons in sheet_variants.items():
+            merge_lessons_by_day(variants[day_type], sheet_lessons)
+
+    log.info(f"Расписание '{schedule_name}': разобрано листов {reparsed}, "
+             f"взято из памяти {len(xls.sheet_names) - reparsed}.")
+    return variants
+
+
+def parse_consultations_incremental(schedule_name: str, xls: WorkbookSession, day_types: Iterable[DayType] = DAY_TYPES,
+                                    timetables: Timetables = TIMETABLES) -> Dict[DayType, Dict[str, List[Consultation]]]:
+    """
+    То же, что parse_consultations, но сразу для нескольких сеток звонков
+    (конец консультации без указанного окончания берется из сетки), а неизменившиеся листы берутся из памяти.
+    """
+    day_types = tuple(day_types)
+    bells = timetables_to_rows(timetables)
+    variants = {day_type: {day: [] for day in DAYS_ORDER} for day_type in day_types}
+    reparsed = 0
+
+    for sheet_name in filter(is_consultation_sheet, xls.sheet_names):
+        try:
+            version = (xls.sheet_fingerprint(sheet_name), bells)
+            key = (schedule_name, 'consultations', sheet_name, day_types)
+            sheet_variants = _sheet_results.get(key, version)
+            if sheet_variants is None:
+                grid = xls.sheet(sheet_name, header_rows=2)
+                layout = _cached_layout(schedule_name, 'consultations', grid, find_consultation_layout)
+                sheet_variants = {day_type: parse_consultation_sheet(grid, layout, day_type, timetables) if layout else {}
+                                  for day_type in day_types}
+                _sheet_results.put(key, sheet_variants, version)
+                reparsed += 1
+        except Exception as e:
+            log.error(f"  [!] Произошла ошибка при парсинге листа '{sheet_name}': {e}", exc_info=True)
+            continue
+
+        for day_type, sheet_consultations in sheet_variants.items():
+            for day_name, consultations in sheet_consultations.items():
+                variants[day_type][day_name].extend(consultations)
+
+    for consultations_by_day in variants.values():
+        sort_consultations(consultations_by_day)
+    log.info(f"Консультации '{schedule_name}': разобрано листов {reparsed}.")
+    return variants
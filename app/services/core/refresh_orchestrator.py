@@ -0,0 +1,127 @@
+# app/services/core/refresh_orchestrator.py
+
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import Config
+from . import cache_manager, incremental_parser
+
+
+log = logging.getLogger(__name__)
+
+
+def _init_worker(log_level: int) -> None:
+    """Настройка логирования в процессе-воркере (в spawn-процесс настройки родителя не переходят)."""
+    logging.basicConfig(level=log_level, stream=sys.stdout)
+
+
+def _build_in_worker(schedule_name: str, sheet_results: list) -> Tuple[bool, str, Optional[bytes], list]:
+    """
+    Сборка кэша в процессе-воркере. Воркер начинает с пустой памятью инкрементального парсера,
+    поэтому получает результаты разбора листов этого расписания от родителя (разбираются только
+    изменившиеся листы) и возвращает их обновленными вместе с кэшем.
+    """
+    incremental_parser.import_sheet_results(sheet_results)
+    success, message, payload = cache_manager.build_cache_artifact(
+        schedule_name, cache_manager.get_cache_file_path(schedule_name))
+    return success, message, payload, incremental_parser.export_sheet_results(schedule_name)
+
+
+def refresh_all(schedule_names: Optional[Iterable[str]] = None, force_update: bool = True,
+                blocking: bool = True, workers: Optional[int] = None) -> Dict[str, Tuple[bool, str]]:
+    """
+    Обновляет несколько расписаний одновременно: скачивание, проверка и парсинг каждого
+    выполняются в отдельном процессе (парсинг упирается в CPU, потоки тут не помогают),
+    а готовый сериализованный кэш атомарно публикует этот процесс. Результаты разбора листов
+    ходят между процессами вместе с расписанием, поэтому и в пуле разбираются только изменившиеся листы.
+    Время обновления всех расписаний примерно равно времени самого долгого из них.
+    Возвращает {имя: (успех, сообщение)}.
+
+    :param force_update: Обновлять, даже если кэш еще не устарел по CACHE_DURATION.
+    :param blocking: Ждать блокировку расписания; при False занятые расписания пропускаются.
+    :param workers: Число процессов (по умолчанию Config.REFRESH_PROCESSES).
+    """
+    schedule_names = list(schedule_names if schedule_names is not None else Config.SCHEDULES)
+    workers = workers if workers is not None else Config.REFRESH_PROCESSES
+    results: Dict[str, Tuple[bool, str]] = {}
+
+    try:
+        os.makedirs(cache_manager.DATA_DIR, exist_ok=True)
+    except OSError as e:
+        log.critical(f"Критическая ошибка: не удалось создать директорию '{cache_manager.DATA_DIR}': {e}")
+        return {name: (False, f"Не удалось создать рабочую директорию: {e}") for name in schedule_names}
+
+    # Блокировки держит этот процесс на все время обновления, воркеры работают только с файлами Excel
+    locks = {}
+    try:
+        for name in schedule_names:
+            if name not in Config.SCHEDULES:
+                results[name] = (False, "Schedule not found")
+                continue
+            schedule_lock = cache_manager.get_schedule_lock(name)
+            if not schedule_lock.acquire(blocking=blocking):
+                log.info(f"Кэш для '{name}' уже обновляется другим процессом. Обновление пропущено.")
+                results[name] = (True, "Обновление уже выполняется.")
+                continue
+            if not force_update and not cache_manager.is_cache_stale(cache_manager.get_cache_file_path(name)):
+                schedule_lock.release()
+                results[name] = (True, "Кэш уже актуален.")
+                continue
+            locks[name] = schedule_lock
+
+        if len(locks) <= 1 or workers <= 1:
+            # Одно расписание быстрее обновить на месте: без запуска процесса и с памятью инкрементального парсера
+            for name in locks:
+                results[name] = _refresh_in_process(name)
+        else:
+            results.update(_refresh_in_pool(list(locks), min(workers, len(locks))))
+    finally:
+        for schedule_lock in locks.values():
+            schedule_lock.release()
+
+    for name in locks:
+        if results[name][0]:
+            cache_manager.warm_memory_cache(name)
+    return {name: results[name] for name in schedule_names}
+
+
+def _refresh_in_process(schedule_name: str) -> Tuple[bool, str]:
+    cache_file = cache_manager.get_cache_file_path(schedule_name)
+    try:
+        success, message, payload = cache_manager.build_cache_artifact(schedule_name, cache_file)
+        if success:
+            cache_manager.publish_cache_artifact(schedule_name, cache_file, payload)
+        return success, message
+    except Exception as e:
+        log.error(f"Непредвиденная ошибка при обновлении '{schedule_name}': {e}", exc_info=True)
+        return False, str(e)
+
+
+def _refresh_in_pool(schedule_names: list, workers: int) -> Dict[str, Tuple[bool, str]]:
+    log.info(f"Параллельное обновление {len(schedule_names)} расписаний в {workers} процессах.")
+    results = {}
+    # spawn, а не fork: родитель (gunicorn, бот) многопоточный, и fork мог бы унести в воркер занятые блокировки
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(logging.getLogger().getEffectiveLevel(),)) as executor:
+        futures = {
+            executor.submit(_build_in_worker, name, incremental_parser.export_sheet_results(name)): name
+            for name in schedule_names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                success, message, payload, sheet_results = future.result()
+                # Следующее обновление этого расписания в родителе (в потоке) не будет разбирать книгу заново
+                incremental_parser.import_sheet_results(sheet_results)
+                if success:
+                    cache_manager.publish_cache_artifact(name, cache_manager.get_cache_file_path(name), payload)
+            except Exception as e:
+                log.error(f"Непредвиденная ошибка при обновлении '{name}': {e}", exc_info=True)
+                success, message = False, str(e)
+            results[name] = (success, message)
+    return results
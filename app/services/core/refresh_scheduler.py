@@ -0,0 +1,124 @@
+# app/services/core/refresh_scheduler.py
+
+import logging
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from typing import Optional
+
+from config import Config
+from . import cache_manager
+from .refresh_orchestrator import refresh_all
+
+from app.services.utils.file_lock import FileLock
+
+
+log = logging.getLogger(__name__)
+
+# На сервере работает один планировщик: каждый воркер gunicorn (и отдельный run_scheduler.py) пытается
+# захватить этот lock-файл, остальные ждут в резерве и подхватывают работу, если владелец завершится
+SCHEDULER_LOCK_PATH = os.path.join(cache_manager.DATA_DIR, 'refresh_scheduler.lock')
+
+
+class RefreshScheduler:
+    """
+    Фоновый планировщик: раз в interval секунд проверяет все расписания из Config.SCHEDULES
+    и пересобирает кэш тех, чей файл на Яндекс.Диске изменился, еще до того, как их кто-то запросит.
+    Проверки выполняются параллельно в ограниченном пуле потоков; к интервалу добавляется
+    случайная задержка, чтобы несколько процессов не обращались к Диску одновременно.
+    Первый проход (холодный старт, когда пересобирать, скорее всего, нужно все) идет через пул процессов.
+    Проходы выполняет только процесс, захвативший SCHEDULER_LOCK_PATH.
+    """
+
+    def __init__(self, interval: Optional[int] = None, workers: Optional[int] = None,
+                 jitter: Optional[int] = None):
+        self.interval = interval if interval is not None else Config.REFRESH_INTERVAL
+        self.workers = workers if workers is not None else Config.REFRESH_WORKERS
+        self.jitter = jitter if jitter is not None else Config.REFRESH_JITTER
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        self._lock = FileLock(SCHEDULER_LOCK_PATH)
+        self._is_leader = False
+
+    def run_once(self) -> dict:
+        """Один проход по всем расписаниям. Возвращает {имя: (успех, сообщение)}."""
+        schedule_names = list(Config.SCHEDULES)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(schedule_names))),
+                                thread_name_prefix='schedule-refresh') as executor:
+            futures = {name: executor.submit(self._refresh_one, name) for name in schedule_names}
+            return {name: future.result() for name, future in futures.items()}
+
+    def run_cold_start(self) -> dict:
+        """
+        Первый проход: все расписания скачиваются и парсятся параллельно в отдельных процессах.
+        Последующие проходы обычно ничего не парсят и идут в потоках (run_once).
+        """
+        try:
+            results = refresh_all(force_update=True, blocking=False)
+        except Exception as e:
+            log.error(f"Планировщик: непредвиденная ошибка при первом обновлении: {e}", exc_info=True)
+            return self.run_once()
+        for name, (success, message) in results.items():
+            if not success:
+                log.error(f"Планировщик: не удалось обновить '{name}': {message}")
+        return results
+
+    def run_forever(self) -> None:
+        """
+        Блокирующий цикл планировщика (для отдельного процесса).
+        Если планировщик уже работает в другом процессе, ждет в резерве, пока тот не завершится.
+        """
+        if not self._acquire_leadership():
+            log.info("Планировщик обновлений уже работает в другом процессе, этот ждет в резерве.")
+            while not self._acquire_leadership():
+                if self._stop_event.wait(self.interval):
+                    return
+
+        log.info(f"Планировщик обновлений запущен: интервал {self.interval} с, потоков {self.workers}.")
+        try:
+            # Небольшая случайная задержка перед первым проходом, чтобы воркеры не стартовали синхронно
+            self._stop_event.wait(random.uniform(0, self.jitter))
+            if not self._stop_event.is_set():
+                self.run_cold_start()
+                self._stop_event.wait(self.interval + random.uniform(0, self.jitter))
+            while not self._stop_event.is_set():
+                self.run_once()
+                self._stop_event.wait(self.interval + random.uniform(0, self.jitter))
+        finally:
+            self._release_leadership()
+        log.info("Планировщик обновлений остановлен.")
+
+    def start(self) -> None:
+        """Запускает планировщик в фоновом потоке (для запуска из фабрики приложения)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self.run_forever, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _acquire_leadership(self) -> bool:
+        """Захватывает lock-файл планировщика без ожидания. Блокировку держит процесс до остановки цикла."""
+        if not self._is_leader:
+            os.makedirs(os.path.dirname(SCHEDULER_LOCK_PATH), exist_ok=True)
+            self._is_leader = self._lock.acquire(blocking=False)
+        return self._is_leader
+
+    def _release_leadership(self) -> None:
+        if self._is_leader:
+            self._lock.release()
+            self._is_leader = False
+
+    @staticmethod
+    def _refresh_one(schedule_name: str):
+        try:
+            success, message = cache_manager.refresh_schedule(schedule_name)
+        except Exception as e:
+            log.error(f"Планировщик: непредвиденная ошибка при обновлении '{schedule_name}': {e}", exc_info=True)
+            return False, str(e)
+        if not success:
+            log.error(f"Планировщик: не удалось обновить '{schedule_name}': {message}")
+        return success, message
@@ -0,0 +1,126 @@
+# app/services/core/view_events.py
+
+import logging
+from threading import Condition, Event, Thread
+from typing import Dict, Optional
+
+from config import Config
+from . import cache_manager, display_state
+from .display_state import DisplayState
+
+from app.services.clients import time_service
+
+
+log = logging.getLogger(__name__)
+
+# Источник событий для экранов (SSE). Один поток на процесс следит за состоянием экранов тех расписаний,
+# на которые кто-то подписан, и будит подписчиков при смене версии. Сколько бы экранов ни было подключено,
+# get_schedule_data вызывается раз в VIEW_EVENTS_CHECK_INTERVAL на расписание, а не на каждый экран.
+# Публикация кэша в этом процессе будит поток сразу; публикации других процессов (планировщик, бот)
+# и границы таймлайна показа замечаются на ближайшей проверке.
+_condition = Condition()
+_states: Dict[str, DisplayState] = {}
+_subscribers: Dict[str, int] = {}
+_wakeup = Event()
+_watcher: Optional[Thread] = None
+
+
+def subscribe(schedule_name: str) -> Optional[DisplayState]:
+    """
+    Регистрирует подписчика и возвращает текущее состояние экрана.
+    None - подписчиков в процессе уже VIEW_EVENTS_MAX_CLIENTS или данных расписания нет
+    (в обоих случаях подписка не оформляется).
+    """
+    global _watcher
+    with _condition:
+        if sum(_subscribers.values()) >= Config.VIEW_EVENTS_MAX_CLIENTS:
+            log.warning(f"События экранов: достигнут предел подписчиков ({Config.VIEW_EVENTS_MAX_CLIENTS}).")
+            return None
+        _subscribers[schedule_name] = _subscribers.get(schedule_name, 0) + 1
+        if _watcher is None:
+            _watcher = Thread(target=_watch, name='view-events', daemon=True)
+            _watcher.start()
+        state = _states.get(schedule_name)
+
+    if state is None:
+        # Первый подписчик расписания: состояние считается сразу, не дожидаясь потока
+        _check(schedule_name)
+        with _condition:
+            state = _states.get(schedule_name)
+        if state is None:
+            unsubscribe(schedule_name)
+    return state
+
+
+def unsubscribe(schedule_name: str) -> None:
+    with _condition:
+        count = _subscribers.get(schedule_name, 0) - 1
+        if count > 0:
+            _subscribers[schedule_name] = count
+        else:
+            # Без подписчиков состояние не отслеживается и может устареть - забываем его
+            _subscribers.pop(schedule_name, None)
+            _states.pop(schedule_name, None)
+
+
+def wait_for_change(schedule_name: str, version: Optional[str], timeout: float) -> Optional[DisplayState]:
+    """
+    Ждет, пока версия состояния экрана станет отличной от version, не дольше timeout секунд.
+    Возвращает новое состояние или None по таймауту (время отправить heartbeat).
+    """
+    def changed() -> bool:
+        state = _states.get(schedule_name)
+        return state is not None and state.version != version
+
+    with _condition:
+        if _condition.wait_for(changed, timeout):
+            return _states[schedule_name]
+    return None
+
+
+def notify_published(schedule_name: str) -> None:
+    """Кэш расписания опубликован в этом процессе - проверить состояние экранов немедленно."""
+    _wakeup.set()
+
+
+def get_view_events_stats() -> dict:
+    with _condition:
+        return {"subscribers": dict(_subscribers), "versions": {name: s.version for name, s in _states.items()}}
+
+
+def _watch() -> None:
+    while True:
+        _wakeup.wait(Config.VIEW_EVENTS_CHECK_INTERVAL)
+        _wakeup.clear()
+        with _condition:
+            schedule_names = list(_subscribers)
+        for schedule_name in schedule_names:
+            _check(schedule_name)
+
+
+def _check(schedule_name: str) -> None:
+    """Считает текущее состояние экрана и будит подписчиков, если его версия изменилась."""
+    try:
+        all_data = cache_manager.get_schedule_data(schedule_name)
+        if all_data.get("error"):
+            log.warning(f"События экранов: нет данных для '{schedule_name}': {all_data['error']}")
+            return
+        state = display_state.get_display_state(schedule_name, all_data, time_service.get_current_day_and_time())
+    except Exception as e:
+        log.error(f"События экранов: ошибка при проверке '{schedule_name}': {e}", exc_info=True)
+        return
+    if state is None:
+        return
+
+    with _condition:
+        if schedule_name not in _subscribers:
+            return
+        previous = _states.get(schedule_name)
+        if previous is None or previous.version != state.version:
+            _states[schedule_name] = state
+            _condition.notify_all()
+            if previous is not None:
+                log.info(f"События экранов: состояние '{schedule_name}' изменилось ({state.version}).")
+
+
+cache_manager.add_publish_listener(notify_published)
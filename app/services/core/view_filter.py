@@ -1,98 +1,193 @@
 # app/services/core/view_filter.py
 
 import logging
-from datetime import datetime, timedelta, time as time_obj
+from bisect import bisect_right
+from datetime import time as time_obj
+from typing import Dict, List, Optional, Tuple
 from config import Config
 
+from app.services.utils.bell_schedule import BellTimetable
+from app.services.utils.enums import Shift
+
 
 log = logging.getLogger(__name__)
 
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+def _seconds_of_day(t: time_obj) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
 
-def filter_schedule_for_display(schedule_for_day: dict, time_info: object) -> dict:
+def _display_window(start: time_obj, end: time_obj) -> Tuple[int, int]:
     """
-    Фильтрует уроки для ландшафтного режима, показывая только актуальные.
-    Возвращает измененный словарь с расписанием на день.
+    Переводит время начала и окончания в окно показа (секунды от начала суток)
+    с учетом SHOW_BEFORE_START_MIN / SHOW_AFTER_END_MIN.
     """
-    if not schedule_for_day or not schedule_for_day.get("landscape_slides"):
-        return {"landscape_slides": []}
+    return (_seconds_of_day(start) - Config.SHOW_BEFORE_START_MIN * 60,
+            _seconds_of_day(end) + Config.SHOW_AFTER_END_MIN * 60)
 
-    today_date_obj = datetime.strptime(time_info.date_str_iso, '%Y-%m-%d').date()
-    current_dt = datetime.combine(today_date_obj, time_info.time_obj)
 
-    initial_slides = schedule_for_day.get("landscape_slides", [])
-    active_grade_groups = []
+def _grade_group_windows(grade_groups: list) -> List[Optional[Tuple[int, int]]]:
+    """Окна показа для каждой группы классов."""
+    windows = []
+    for grade_data in grade_groups:
+        try:
+            # Конвертируем время из строк обратно в объекты time
+            windows.append(_display_window(time_obj.fromisoformat(grade_data['first_lesson_time']),
+                                           time_obj.fromisoformat(grade_data['last_lesson_end_time'])))
+        except (ValueError, TypeError) as e:
+            log.warning(f"Ошибка при фильтрации уроков для группы {grade_data.get('grade_key')}: {e}")
+            windows.append(None)
+    return windows
 
-    for slide in initial_slides:
-        for grade_data in slide:
-            try:
-                # Конвертируем время из строк обратно в объекты time
-                first_lesson_time = time_obj.fromisoformat(grade_data['first_lesson_time'])
-                last_lesson_end_time = time_obj.fromisoformat(grade_data['last_lesson_end_time'])
 
-                start_dt = datetime.combine(today_date_obj, first_lesson_time) - timedelta(
-                    minutes=Config.SHOW_BEFORE_START_MIN)
-                end_dt = datetime.combine(today_date_obj, last_lesson_end_time) + timedelta(
-                    minutes=Config.SHOW_AFTER_END_MIN)
+def _consultations_window(consultations_for_day: list) -> Optional[Tuple[int, int]]:
+    """
+    Окно показа консультаций на день.
+    None означает "показывать всегда" (нет данных для фильтра или они некорректны).
+    """
+    try:
+        valid_consultations = [c for c in consultations_for_day if c.get('start_time') and c.get('end_time')]
+        if not valid_consultations:
+            return None
+
+        first_start_time = min(time_obj.fromisoformat(c['start_time']) for c in valid_consultations)
+        last_end_time = max(time_obj.fromisoformat(c['end_time']) for c in valid_consultations)
+        return _display_window(first_start_time, last_end_time)
+    except (ValueError, TypeError) as e:
+        log.warning(f"Не удалось отфильтровать консультации по времени: {e}")
+        return None
 
-                if start_dt <= current_dt <= end_dt:
-                    active_grade_groups.append(grade_data)
-            except (ValueError, TypeError) as e:
-                log.warning(f"Ошибка при фильтрации уроков для группы {grade_data.get('grade_key')}: {e}")
-                continue
 
-    # Перегруппировка слайдов после фильтрации
-    filtered_slides = []
+def _pack_slides(row_counts: List[int]) -> List[List[int]]:
+    """
+    Перегруппировка групп классов в слайды (по 2 группы на слайд, если влезает).
+    Принимает число строк каждой группы и возвращает слайды как списки индексов групп.
+    """
+    slides = []
     i = 0
-    while i < len(active_grade_groups):
-        g1 = active_grade_groups[i]
-        g1_rows = len(g1.get('schedule_rows', []))
-
-        if i + 1 < len(active_grade_groups):
-            g2 = active_grade_groups[i + 1]
-            g2_rows = len(g2.get('schedule_rows', []))
-
-            if g1_rows + g2_rows <= 16:
-                filtered_slides.append([g1, g2])
-                i += 2
-            else:
-                filtered_slides.append([g1])
-                i += 1
+    while i < len(row_counts):
+        if i + 1 < len(row_counts) and row_counts[i] + row_counts[i + 1] <= 16:
+            slides.append([i, i + 1])
+            i += 2
         else:
-            filtered_slides.append([g1])
+            slides.append([i])
             i += 1
+    return slides
+
 
-    schedule_for_day["landscape_slides"] = filtered_slides
-    return schedule_for_day
+def _is_visible(window: Optional[Tuple[int, int]], seconds: int) -> bool:
+    return window is not None and window[0] <= seconds <= window[1]
 
 
-def filter_consultations_for_display(consultations_for_day: list, time_info: object) -> list:
+def build_display_timeline(schedule_for_day: dict, consultations_for_day: list) -> dict:
     """
-    Фильтрует консультации, показывая только актуальные.
-    Возвращает отфильтрованный список консультаций.
+    Строит "таймлайн" показа на день: отсортированный список моментов, в которые меняется
+    набор видимых групп классов или видимость консультаций. Для каждого момента хранится
+    уже упакованный список слайдов (индексы групп в порядке landscape_slides).
+    Вызывается один раз при сборке кэша.
     """
-    if not consultations_for_day:
-        return []
+    grade_groups = [g for slide in (schedule_for_day or {}).get("landscape_slides", []) for g in slide]
+    group_windows = _grade_group_windows(grade_groups)
+    row_counts = [len(g.get('schedule_rows', [])) for g in grade_groups]
+    consultations_window = _consultations_window(consultations_for_day) if consultations_for_day else None
+
+    # Видимость меняется в момент начала окна и сразу после его окончания
+    instants = {0}
+    for window in group_windows + [consultations_window]:
+        if window is None:
+            continue
+        for instant in (window[0], window[1] + 1):
+            if 0 <= instant < SECONDS_IN_DAY:
+                instants.add(instant)
+
+    timeline_instants, states = [], []
+    for instant in sorted(instants):
+        active = [i for i, window in enumerate(group_windows) if _is_visible(window, instant)]
+        packed = _pack_slides([row_counts[i] for i in active])
+        state = {
+            "slides": [[active[j] for j in slide] for slide in packed],
+            "consultations": bool(consultations_for_day) and (
+                consultations_window is None or _is_visible(consultations_window, instant)),
+        }
+        if states and states[-1] == state:
+            continue
+        timeline_instants.append(instant)
+        states.append(state)
+
+    return {
+        "offsets": [Config.SHOW_BEFORE_START_MIN, Config.SHOW_AFTER_END_MIN],
+        "instants": timeline_instants,
+        "states": states,
+    }
+
+
+def get_timeline_state(timeline: Optional[dict], time_info: object) -> Optional[dict]:
+    """
+    Находит состояние таймлайна на текущий момент бинарным поиском.
+    Возвращает None, если таймлайна нет или он собран с другими настройками показа.
+    """
+    if not timeline or timeline.get("offsets") != [Config.SHOW_BEFORE_START_MIN, Config.SHOW_AFTER_END_MIN]:
+        return None
+    idx = bisect_right(timeline["instants"], _seconds_of_day(time_info.time_obj)) - 1
+    return timeline["states"][max(idx, 0)]
 
-    today_date_obj = datetime.strptime(time_info.date_str_iso, '%Y-%m-%d').date()
-    current_dt = datetime.combine(today_date_obj, time_info.time_obj)
 
-    try:
-        valid_consultations = [c for c in consultations_for_day if c.get('start_time') and c.get('end_time')]
-        if not valid_consultations:
-            return consultations_for_day  # Возвращаем все, если нет данных для фильтра
+def describe_bells(day_bells: Dict[Shift, BellTimetable], at: time_obj) -> str:
+    """
+    Строка для шапки экрана: по каждой смене - идущий урок или ближайший следующий
+    ("1 смена: идет 3 урок до 10:45 · 2 смена: 0 урок в 12:35"). Меняется только по звонкам.
+    """
+    parts = []
+    for shift, timetable in day_bells.items():
+        current, upcoming = timetable.current_and_next(at)
+        if current:
+            parts.append(f"{shift.value}: идет {current.number} урок до {current.end_time}")
+        elif upcoming:
+            parts.append(f"{shift.value}: {upcoming.number} урок в {upcoming.start_time}")
+    return " · ".join(parts)
 
-        first_start_time = min(time_obj.fromisoformat(c['start_time']) for c in valid_consultations)
-        last_end_time = max(time_obj.fromisoformat(c['end_time']) for c in valid_consultations)
 
-        start_display_dt = datetime.combine(today_date_obj, first_start_time) - timedelta(
-            minutes=Config.SHOW_BEFORE_START_MIN)
-        end_display_dt = datetime.combine(today_date_obj, last_end_time) + timedelta(minutes=Config.SHOW_AFTER_END_MIN)
+def filter_schedule_for_display(schedule_for_day: dict, time_info: object, timeline: Optional[dict] = None) -> dict:
+    """
+    Фильтрует уроки для ландшафтного режима, показывая только актуальные.
+    Возвращает новый словарь с расписанием на день (исходный словарь из кэша не изменяется).
+    Если передан таймлайн дня, готовые слайды берутся из него без пересчета.
+    """
+    if not schedule_for_day or not schedule_for_day.get("landscape_slides"):
+        return {"landscape_slides": []}
 
-        if start_display_dt <= current_dt <= end_display_dt:
-            return consultations_for_day
-        else:
-            return []  # Время консультаций еще не пришло или уже прошло
+    grade_groups = [grade_data for slide in schedule_for_day["landscape_slides"] for grade_data in slide]
 
-    except (ValueError, TypeError) as e:
-        log.warning(f"Не удалось отфильтровать консультации по времени: {e}")
-        return consultations_for_day  # В случае ошибки показываем все
\ No newline at end of file
+    state = get_timeline_state(timeline, time_info)
+    if state is not None:
+        slides = state["slides"]
+    else:
+        current_seconds = _seconds_of_day(time_info.time_obj)
+        active = [i for i, window in enumerate(_grade_group_windows(grade_groups))
+                  if _is_visible(window, current_seconds)]
+        slides = [[active[j] for j in slide]
+                  for slide in _pack_slides([len(grade_groups[i].get('schedule_rows', [])) for i in active])]
+
+    filtered_slides = [[grade_groups[i] for i in slide] for slide in slides]
+    return {**schedule_for_day, "landscape_slides": filtered_slides}
+
+
+def filter_consultations_for_display(consultations_for_day: list, time_info: object,
+                                     timeline: Optional[dict] = None) -> list:
+    """
+    Фильтрует консультации, показывая только актуальные.
+    Возвращает отфильтрованный список консультаций.
+    """
+    if not consultations_for_day:
+        return []
+
+    state = get_timeline_state(timeline, time_info)
+    if state is not None:
+        return consultations_for_day if state["consultations"] else []
+
+    window = _consultations_window(consultations_for_day)
+    if window is None or _is_visible(window, _seconds_of_day(time_info.time_obj)):
+        return consultations_for_day  # Нет данных для фильтра или время консультаций сейчас
+    return []  # Время консультаций еще не пришло или уже прошло
@@ -7,11 +7,13 @@ from datetime import time
 from app.services.utils.enums import Shift
 
 
-@dataclass
+@dataclass(slots=True)
 class RawLesson:
     """
     Универсальная структура для хранения "сырых" данных об одном уроке,
     извлеченных напрямую из ячейки Excel.
+    Уроков в расписании тысячи, поэтому класс без __dict__ (slots), а повторяющиеся
+    строки и объекты time парсер передает общими ссылками, а не копиями.
     """
     day_name: str
     class_name: str
@@ -1,20 +1,28 @@
 # app/services/parsers/consultation_parser.py
 
-import pandas as pd
 import logging
 import re
+import sys
+import numpy as np
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, Dict, Tuple, List
 
-from app.services.utils.data_validator import parse_time_str
-from app.services.utils.bell_schedule import get_end_time
+from app.services.utils.excel_reader import WorkbookSession, SheetGrid
+from app.services.utils.normalization import parse_time_str, clean_room
+from app.services.utils.bell_schedule import BellTimetable, Timetables, TIMETABLES, load_timetables
 from app.services.utils.enums import DayType, Shift
 
 
 log = logging.getLogger(__name__)
 
+DAYS_ORDER = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота"]
 
-@dataclass
+_TIME_RANGE_RE = re.compile(r'(\d{1,2}[.:]\d{2})\s*-\s*(\d{1,2}[.:]\d{2})')
+_TIME_START_RE = re.compile(r'(\d{1,2}[.:]\d{2})')
+
+
+@dataclass(slots=True)
 class Consultation:
     teacher: str
     time: str
@@ -35,36 +43,55 @@ def _parse_consultation_time_for_sort(time_str: str) -> tuple:
     return (99, 99)
 
 
-def _process_time_string(time_str: str, shift: Shift, day_type: Optional[DayType]) -> list:
-    if not isinstance(time_str, str): return []
-    consultations = []
+@lru_cache(maxsize=4096)
+def _split_time_string(time_str: str) -> Optional[tuple]:
+    """
+    Разбирает ячейку времени консультации в кортеж (исходное время, начало, конец) или None;
+    конец - None, если в ячейке указано только начало (его дает сетка звонков).
+    Одни и те же строки времени повторяются у многих учителей и на разных листах,
+    поэтому результат запоминается (строки интернированы - их делят все консультации).
+    """
+    if not isinstance(time_str, str): return None
     # Пробуем найти явный диапазон "ЧЧ:ММ-ЧЧ:ММ"
-    match_range = re.search(r'(\d{1,2}[.:]\d{2})\s*-\s*(\d{1,2}[.:]\d{2})', time_str)
+    match_range = _TIME_RANGE_RE.search(time_str)
     if match_range:
         start_str, end_str = match_range.groups()
         start_obj = parse_time_str(start_str)
         end_obj = parse_time_str(end_str)
         if start_obj and end_obj:
-            return [{'original_time': time_str, 'start_time': start_str.replace('.', ':'),
-                     'end_time': end_str.replace('.', ':')}]
+            return (sys.intern(time_str), sys.intern(start_str.replace('.', ':')),
+                    sys.intern(end_str.replace('.', ':')))
 
-    # Если диапазона нет, ищем просто время начала и вычисляем конец по звонкам
-    match_start = re.search(r'(\d{1,2}[.:]\d{2})', time_str)
+    # Если диапазона нет, берем просто время начала
+    match_start = _TIME_START_RE.search(time_str)
     if match_start:
-        start_str = match_start.group(1).replace('.', ':')
-        # Определяем урок по времени, чтобы найти конец
-        try:
-            h = int(start_str.split(':')[0])
-            calc_shift = Shift.SECOND if h >= 13 else shift
-            end_str = get_end_time(start_str, calc_shift, day_type)
-            if end_str:
-                return [{'original_time': time_str, 'start_time': start_str, 'end_time': end_str}]
-        except:
-            pass
-    return []
+        return sys.intern(time_str), sys.intern(match_start.group(1).replace('.', ':')), None
+    return None
 
 
-def _map_column_indices(df_columns) -> Tuple[Optional[int], Dict[str, Tuple[int, int]]]:
+def _process_time_string(time_str: str, shift: Shift, day_timetables: Dict[Shift, BellTimetable],
+                         normal_timetables: Dict[Shift, BellTimetable]) -> Optional[tuple]:
+    """
+    Кортеж (исходное время, начало, конец) для ячейки времени или None.
+    Конец, которого нет в ячейке, - конец урока, начинающегося в это время, по сетке дня.
+    """
+    time_data = _split_time_string(time_str)
+    if time_data is None or time_data[2] is not None:
+        return time_data
+
+    original_time, start_str, _ = time_data
+    # Определяем урок по времени, чтобы найти конец
+    calc_shift = Shift.SECOND if int(start_str.split(':')[0]) >= 13 else shift
+    for timetables in (day_timetables, normal_timetables):
+        # Консультации, начало которых есть только в обычной сетке, берут конец из нее
+        timetable = timetables.get(calc_shift)
+        lesson = timetable.by_start_time(start_str) if timetable else None
+        if lesson:
+            return original_time, start_str, lesson.end_time
+    return None
+
+
+def _map_column_indices(columns) -> Tuple[Optional[int], Dict[str, Tuple[int, int]]]:
     """Находит индекс колонки учителя и сопоставляет индексы для каждого дня недели."""
     days_map = {
         "понедельник": "Понедельник", "вторник": "Вторник", "среда": "Среда",
@@ -75,7 +102,7 @@ def _map_column_indices(df_columns) -> Tuple[Optional[int], Dict[str, Tuple[int,
     day_col_indices = {}
 
     # Ищем колонку учителя
-    for i, col_tuple in enumerate(df_columns):
+    for i, col_tuple in enumerate(columns):
         full_col_name = " ".join(map(str, col_tuple)).lower()
         if 'учитель' in full_col_name or 'фио' in full_col_name:
             teacher_col_idx = i
@@ -84,7 +111,7 @@ def _map_column_indices(df_columns) -> Tuple[Optional[int], Dict[str, Tuple[int,
     # Ищем колонки для дней недели
     for day_key, day_name in days_map.items():
         time_idx, room_idx = -1, -1
-        for i, col_tuple in enumerate(df_columns):
+        for i, col_tuple in enumerate(columns):
             col_str = " ".join(map(str, col_tuple)).lower()
             if day_key in col_str:
                 if 'время' in col_str:
@@ -97,64 +124,101 @@ def _map_column_indices(df_columns) -> Tuple[Optional[int], Dict[str, Tuple[int,
     return teacher_col_idx, day_col_indices
 
 
+def is_consultation_sheet(sheet_name: str) -> bool:
+    return 'консультац' in sheet_name.lower()
+
+
+def find_consultation_layout(grid: SheetGrid) -> Optional[Tuple[int, Dict[str, Tuple[int, int]]]]:
+    """
+    Определяет раскладку листа консультаций: колонку учителя и колонки времени/кабинета по дням.
+    Возвращает None, если колонка учителя не найдена.
+    """
+    teacher_col_idx, day_col_indices = _map_column_indices(grid.columns)
+    if teacher_col_idx is None:
+        log.warning(f"  [✗] Пропуск листа '{grid.name}': не найдена колонка 'Учитель'/'ФИО'.")
+        return None
+    return teacher_col_idx, day_col_indices
+
+
+def parse_consultation_sheet(grid: SheetGrid, layout: Tuple[int, Dict[str, Tuple[int, int]]],
+                             day_type_override: Optional[DayType] = None,
+                             timetables: Timetables = TIMETABLES) -> Dict[str, List[Consultation]]:
+    """
+    Разбирает один лист консультаций с уже найденной раскладкой. Результат не отсортирован.
+    Конец консультации, у которой указано только начало, берется из сетки звонков (timetables).
+    """
+    teacher_col_idx, day_col_indices = layout
+    consultations_by_day = {day: [] for day in DAYS_ORDER}
+    shift = Shift.SECOND if "2смена" in grid.name.lower().replace(" ", "") else Shift.FIRST
+    day_type = day_type_override or DayType.NORMAL
+    day_timetables, normal_timetables = timetables.get(day_type, {}), timetables.get(DayType.NORMAL, {})
+
+    log.info(f"  [✓] Анализ листа '{grid.name}'...")
+    if not len(grid):
+        return consultations_by_day
+
+    # 2. Все нужные колонки разом, уже как обрезанный текст
+    values = np.array(grid.rows, dtype=object).reshape(len(grid), len(grid.columns))
+    teachers = np.char.strip(values[:, teacher_col_idx].astype(str))
+    has_teacher = (teachers != '') & (teachers != 'nan')
+
+    # 3. Проходим по дням: только строки, где есть и учитель, и время
+    for day_name, (time_idx, room_idx) in day_col_indices.items():
+        times = np.char.strip(values[:, time_idx].astype(str))
+        rows = np.flatnonzero(has_teacher & (times != '') & (times != 'nan'))
+        if not len(rows):
+            continue
+        rooms = np.char.strip(values[rows, room_idx].astype(str)).tolist() if room_idx != -1 else ['—'] * len(rows)
+
+        day_consultations = consultations_by_day[day_name]
+        for teacher, time_val, room_val in zip(teachers[rows].tolist(), times[rows].tolist(), rooms):
+            time_data = _process_time_string(time_val, shift, day_timetables, normal_timetables)
+            if time_data is None:
+                continue
+            original_time, start_time, end_time = time_data
+            day_consultations.append(Consultation(
+                teacher=teacher, time=original_time, room=clean_room(room_val),
+                start_time=start_time, end_time=end_time
+            ))
+    return consultations_by_day
+
+
+def sort_consultations(consultations_by_day: Dict[str, List[Consultation]]) -> None:
+    """Сортирует консультации каждого дня по времени начала."""
+    for day in consultations_by_day:
+        consultations_by_day[day].sort(key=lambda x: _parse_consultation_time_for_sort(x.time))
+
+
 # --- ГЛАВНАЯ ФУНКЦИЯ, ТЕПЕРЬ ОНА ЧИЩЕ ---
 
-def parse_consultations(xls: pd.ExcelFile, day_type_override: Optional[DayType] = None) -> Dict[
+def parse_consultations(xls: WorkbookSession, day_type_override: Optional[DayType] = None) -> Dict[
     str, List[Consultation]]:
     """
     Парсит все листы с консультациями в Excel-файле и возвращает единый словарь.
     """
-    days_order = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота"]
-    consultations_by_day = {day: [] for day in days_order}
+    consultations_by_day = {day: [] for day in DAYS_ORDER}
 
     log.info("Запуск парсера консультаций...")
+    timetables = load_timetables(xls)
     for sheet_name in xls.sheet_names:
         # 1. Проверяем, подходит ли лист для парсинга
-        if 'консультац' not in sheet_name.lower():
+        if not is_consultation_sheet(sheet_name):
             log.info(f"  [✗] Пропуск листа '{sheet_name}': не является листом консультаций.")
             continue
 
         try:
-            df = pd.read_excel(xls, sheet_name=sheet_name, header=[0, 1])
-
-            teacher_col_idx, day_col_indices = _map_column_indices(df.columns)
-
-            if teacher_col_idx is None:
-                log.warning(f"  [✗] Пропуск листа '{sheet_name}': не найдена колонка 'Учитель'/'ФИО'.")
+            grid = xls.sheet(sheet_name, header_rows=2)
+            layout = find_consultation_layout(grid)
+            if layout is None:
                 continue
 
-            log.info(f"  [✓] Анализ листа '{sheet_name}'...")
-
-            # 2. Итерируемся по строкам и извлекаем данные
-            for row_idx in range(len(df)):
-                teacher = str(df.iloc[row_idx, teacher_col_idx]).strip()
-                if not teacher or teacher == 'nan': continue
-
-                for day_name, (time_idx, room_idx) in day_col_indices.items():
-                    time_val = str(df.iloc[row_idx, time_idx]).strip()
-                    if not time_val or time_val == 'nan': continue
-
-                    room_val = str(df.iloc[row_idx, room_idx]).strip().replace('.0', '') if room_idx != -1 else '—'
-                    if not room_val or room_val == 'nan': room_val = '—'
-
-                    shift = Shift.SECOND if "2смена" in sheet_name.lower().replace(" ", "") else Shift.FIRST
-                    day_type = day_type_override or DayType.NORMAL
-
-                    processed_times = _process_time_string(time_val, shift, day_type)
-                    for time_data in processed_times:
-                        consultations_by_day[day_name].append(Consultation(
-                            teacher=teacher,
-                            time=time_data['original_time'],
-                            room=room_val,
-                            start_time=time_data['start_time'],
-                            end_time=time_data['end_time']
-                        ))
+            for day_name, consultations in parse_consultation_sheet(grid, layout, day_type_override, timetables).items():
+                consultations_by_day[day_name].extend(consultations)
         except Exception as e:
             log.error(f"  [!] Произошла ошибка при парсинге листа '{sheet_name}': {e}", exc_info=True)
 
     # 3. Сортировка результатов
-    for day in consultations_by_day:
-        consultations_by_day[day].sort(key=lambda x: _parse_consultation_time_for_sort(x.time))
+    sort_consultations(consultations_by_day)
 
     log.info("Парсер консультаций завершил работу.")
-    return consultations_by_day
\ No newline at end of file
+    return consultations_by_day
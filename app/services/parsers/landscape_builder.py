@@ -11,8 +11,10 @@ from .common_structs import RawLesson
 from app.services.utils.enums import Shift
 
 
+_GRADE_RE = re.compile(r'(\d+)')
+
 # --- Структуры данных, специфичные для ландшафтного режима ---
-@dataclass
+@dataclass(slots=True)
 class LandscapeTableRow:
     lesson_number: any
     display_time: str
@@ -21,7 +23,7 @@ class LandscapeTableRow:
     end_time: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class LandscapeGradeGroup:
     grade_key: str
     class_names: List[str]
@@ -45,11 +47,14 @@ def _process_grade_group(grade_classes: Dict[str, List[RawLesson]], grade_num: i
     sorted_lessons = sorted(all_lessons, key=lambda l: l.start_time_obj or time(0, 0))
 
     for display_time, lessons_in_group_iter in groupby(sorted_lessons, key=key_func):
-        lessons_in_group = list(lessons_in_group_iter)
-        first_lesson = lessons_in_group[0]
+        # Индекс строки "класс -> первый урок класса в этом слоте", чтобы не искать урок перебором для каждого класса
+        lessons_by_class = {}
+        for lesson in lessons_in_group_iter:
+            lessons_by_class.setdefault(lesson.class_name, lesson)
+        first_lesson = next(iter(lessons_by_class.values()))
         subjects_for_row = {}
         for class_name in grade_class_names:
-            lesson = next((l for l in lessons_in_group if l.class_name == class_name), None)
+            lesson = lessons_by_class.get(class_name)
             subjects_for_row[class_name] = {'предмет': lesson.subject, 'кабинет': lesson.cabinet} if lesson else {
                 'предмет': '', 'кабинет': ''}
 
@@ -72,43 +77,41 @@ def build_landscape_view(daily_lessons: List[RawLesson]) -> List[List[Dict[str,
     Строит структуру данных для ландшафтного режима (слайды карусели).
     """
     temp_landscape_view = {}
+    grade_of_key = {}  # Ключ группы -> номер параллели (для сортировки групп)
 
-    # Группируем уроки по сменам
-    sort_key = lambda l: l.shift.name
-    group_key = lambda l: l.shift
-
-    sorted_by_shift = sorted(daily_lessons, key=sort_key)
+    # Параллель (10, 11 и т.д.) определяется один раз на класс, а не для каждого урока
+    grade_by_class = {name: int(_GRADE_RE.match(name).group(1)) for name in {l.class_name for l in daily_lessons}}
 
-    for shift_obj, lessons_in_shift_iter in groupby(sorted_by_shift, key=group_key):
-        # Теперь shift_obj - это Shift.FIRST или Shift.SECOND
-        lessons_in_shift = list(lessons_in_shift_iter)
+    # Один проход: смена -> параллель -> класс -> уроки класса в исходном порядке
+    lessons_by_shift = {}
+    for lesson in daily_lessons:
+        grades = lessons_by_shift.setdefault(lesson.shift, {})
+        grades.setdefault(grade_by_class[lesson.class_name], {}).setdefault(lesson.class_name, []).append(lesson)
 
-        # Группируем уроки в смене по классам (10, 11 и т.д.)
-        get_grade = lambda l: int(re.match(r'(\d+)', l.class_name).group(1))
-        for grade_num, lessons_in_grade_iter in groupby(sorted(lessons_in_shift, key=get_grade), key=get_grade):
+    for shift_obj in sorted(lessons_by_shift, key=lambda s: s.name):
+        lessons_by_grade = lessons_by_shift[shift_obj]
+        for grade_num in sorted(lessons_by_grade):
             if grade_num < 5: continue
 
-            # Группируем по полному имени класса ('10А', '10Б')
-            lessons_by_class_name = {
-                k: list(v) for k, v in
-                groupby(sorted(list(lessons_in_grade_iter), key=lambda l: l.class_name), key=lambda l: l.class_name)
-            }
+            # Классы параллели ('10А', '10Б') в порядке имен
+            lessons_by_class_name = dict(sorted(lessons_by_grade[grade_num].items()))
 
             num_classes = len(lessons_by_class_name)
             if num_classes <= 6:
-                group = _process_grade_group(lessons_by_class_name, grade_num, shift_obj)
-                if group: temp_landscape_view[group.grade_key] = group
+                groups = [_process_grade_group(lessons_by_class_name, grade_num, shift_obj)]
             else:  # Разбиваем большие параллели на 2 части
                 split_point = (num_classes + 1) // 2
-                sorted_items = sorted(lessons_by_class_name.items())
-                group1 = _process_grade_group(dict(sorted_items[:split_point]), grade_num, shift_obj, " (1/2)")
-                if group1: temp_landscape_view[group1.grade_key] = group1
-                group2 = _process_grade_group(dict(sorted_items[split_point:]), grade_num, shift_obj, " (2/2)")
-                if group2: temp_landscape_view[group2.grade_key] = group2
+                sorted_items = list(lessons_by_class_name.items())
+                groups = [_process_grade_group(dict(sorted_items[:split_point]), grade_num, shift_obj, " (1/2)"),
+                          _process_grade_group(dict(sorted_items[split_point:]), grade_num, shift_obj, " (2/2)")]
+            for group in groups:
+                if group:
+                    temp_landscape_view[group.grade_key] = group
+                    grade_of_key[group.grade_key] = grade_num
 
     # Финальная группировка по слайдам (по 2 группы на слайд, если влезает)
     landscape_slides = []
-    sorted_keys = sorted(temp_landscape_view.keys(), key=lambda k: (int(re.search(r'(\d+)', k).group(1)), k))
+    sorted_keys = sorted(temp_landscape_view.keys(), key=lambda k: (grade_of_key[k], k))
     i = 0
     while i < len(sorted_keys):
         g1_data = temp_landscape_view[sorted_keys[i]]
@@ -1,54 +1,27 @@
 # app/services/parsers/schedule_parser.py
 
-import pandas as pd
 import logging
-import re
-from typing import List, Dict, Tuple, Optional
+import sys
+import numpy as np
+from typing import Iterable, List, Dict, Tuple, Optional
 
 from .common_structs import RawLesson
 
-from app.services.utils.data_validator import is_valid_class_name, normalize_class_name, parse_time_str
-from app.services.utils.bell_schedule import get_lesson_by_number
-from app.services.utils.enums import DayType, Shift
+from app.services.utils.excel_reader import WorkbookSession, SheetGrid
+from app.services.utils.normalization import (
+    is_valid_class_name, normalize_class_name, format_lesson_number, shift_from_time, clean_cabinet,
+    shift_from_sheet_name, day_type_from_sheet_name
+)
+from app.services.utils.bell_schedule import BellTimetable, Timetables, TIMETABLES, get_timetable, load_timetables
+from app.services.utils.enums import DayType
 
 
 log = logging.getLogger(__name__)
 
-
-# Вспомогательные функции, которые нужны именно этому парсеру
-def _format_lesson_number(val: any) -> str:
-    try:
-        float_val = float(val)
-        if float_val.is_integer():
-            return str(int(float_val))
-        return str(val)
-    except (ValueError, TypeError):
-        return str(val).split('.')[0]
-
-
-def _get_shift_from_time(time_str: str) -> Shift:
-    try:
-        hour_str = time_str.split('.')[0].split(':')[0]
-        hour = int(re.match(r'(\d+)', hour_str).group(1))
-        return Shift.SECOND if hour >= 12 else Shift.FIRST
-    except (ValueError, IndexError, AttributeError):
-        return Shift.FIRST
-
-
-def _get_shift_from_sheet_name(sheet_name: str) -> Optional[Shift]:
-    clean_name = str(sheet_name).strip().lower()
-    if re.search(r'\(1\s?смена\)', clean_name): return Shift.FIRST
-    if re.search(r'\(2\s?смена\)', clean_name): return Shift.SECOND
-    return None
-
-
-def _get_day_type_from_sheet_name(sheet_name: str) -> DayType:
-    clean_name = str(sheet_name).strip().lower()
-    if re.search(r'\(сокр\)', clean_name):
-        return DayType.SHORT
-    return DayType.NORMAL
+REQUIRED_COLUMNS = {'Дни', 'Уроки', 'Время'}
 
 
+# Вспомогательные функции, которые нужны именно этому парсеру
 def _find_class_columns(df_columns: List[str]) -> Dict[str, Tuple[str, str]]:
     """Находит и сопоставляет колонки предметов и кабинетов для каждого класса."""
     class_column_pairs = {}
@@ -65,76 +38,165 @@ def _find_class_columns(df_columns: List[str]) -> Dict[str, Tuple[str, str]]:
     return class_column_pairs
 
 
-# --- Главная функция парсера ---
+def merge_lessons_by_day(target: Dict[str, List[RawLesson]], sheet_lessons: Dict[str, List[RawLesson]]) -> None:
+    """Добавляет уроки листа к общему словарю по дням, сохраняя порядок листов."""
+    for day_name, lessons in sheet_lessons.items():
+        target.setdefault(day_name, []).extend(lessons)
+
 
-def parse_schedule(xls: pd.ExcelFile, day_type_override: Optional[DayType] = None) -> Dict[str, List[RawLesson]]:
+def _resolve_bell_slots(lesson_values, time_values, timetable: Optional[BellTimetable]) -> list:
     """
-    Главная функция парсера. Читает Excel и возвращает словарь, где
-    ключ - это день недели, а значение - плоский список всех уроков за этот день.
+    Сопоставляет строкам дня время звонков по сетке смены: один раз на день и смену, а не на каждый урок.
+    Для каждой строки возвращает (начало, конец, отображаемое время, time начала, time конца).
     """
-    raw_lessons_by_day: Dict[str, List[RawLesson]] = {}
-    required_columns = {'Дни', 'Уроки', 'Время'}
+    slots = []
+    for lesson_val, time_val in zip(lesson_values, time_values):
+        bell_lesson = timetable.by_number(lesson_val) if timetable else None
+        if bell_lesson:
+            start_t, end_t = bell_lesson.start_time, bell_lesson.end_time
+            slots.append((start_t, end_t, f"{start_t}–{end_t}", bell_lesson.start_time_obj, bell_lesson.end_time_obj))
+        else:
+            slots.append((None, None, sys.intern(str(time_val)), None, None))
+    return slots
 
-    log.info("Запуск парсера расписания...")
-    for sheet_name in xls.sheet_names:
-        # 1. Проверяем, подходит ли лист для парсинга
-        df = pd.read_excel(xls, sheet_name=sheet_name)
-        if not required_columns.issubset(df.columns):
-            log.info(
-                f"  [✗] Пропуск листа '{sheet_name}': не найдены обязательные колонки ({', '.join(required_columns)}).")
-            continue
 
-        class_column_pairs = _find_class_columns(list(df.columns))
-        if not class_column_pairs:
-            log.info(f"  [✗] Пропуск листа '{sheet_name}': не найдено ни одной колонки с именем класса.")
-            continue
+# --- Разбор одного листа ---
 
-        log.info(f"  [✓] Анализ листа '{sheet_name}'...")
+def find_schedule_layout(grid: SheetGrid) -> Optional[Dict[str, Tuple[str, str]]]:
+    """
+    Определяет раскладку листа: пары колонок "предмет/кабинет" для каждого класса.
+    Возвращает None, если лист не является листом расписания.
+    """
+    if not REQUIRED_COLUMNS.issubset(grid.columns):
+        log.info(
+            f"  [✗] Пропуск листа '{grid.name}': не найдены обязательные колонки ({', '.join(REQUIRED_COLUMNS)}).")
+        return None
+
+    class_column_pairs = _find_class_columns(grid.columns)
+    if not class_column_pairs:
+        log.info(f"  [✗] Пропуск листа '{grid.name}': не найдено ни одной колонки с именем класса.")
+        return None
+    return class_column_pairs
 
-        # 2. Подготовка данных
-        df['Дни'] = df['Дни'].ffill()
-        df = df.fillna('')
-        sheet_day_type = day_type_override or _get_day_type_from_sheet_name(sheet_name)
-        sheet_shift_hint = _get_shift_from_sheet_name(sheet_name)
 
-        # 3. Парсинг по дням недели
-        for day_name, day_group in df.groupby('Дни'):
-            if day_name not in raw_lessons_by_day:
-                raw_lessons_by_day[day_name] = []
+def parse_schedule_sheet(grid: SheetGrid, class_column_pairs: Dict[str, Tuple[str, str]],
+                         day_type_override: Optional[DayType] = None,
+                         timetables: Timetables = TIMETABLES) -> Dict[str, List[RawLesson]]:
+    """
+    Разбирает один лист расписания с уже найденной раскладкой колонок.
+    Возвращает уроки листа по дням (дни - в порядке сортировки названий).
+    """
+    return parse_schedule_sheet_variants(grid, class_column_pairs, [day_type_override], timetables)[day_type_override]
 
-            master_day_grid = [{'урок': r['Уроки'], 'время': r['Время'], 'original_row': r}
-                               for _, r in day_group.iterrows() if r['Уроки'] != '' and r['Время'] != '']
-            if not master_day_grid:
-                continue
 
-            # 4. Парсинг по классам
-            for class_name, (subject_col, cabinet_col) in class_column_pairs.items():
-                if not any(str(info['original_row'][subject_col]).strip() for info in master_day_grid):
-                    continue  # Пропускаем класс, если у него нет уроков в этот день
+def parse_schedule_sheet_variants(grid: SheetGrid, class_column_pairs: Dict[str, Tuple[str, str]],
+                                  day_types: Iterable[Optional[DayType]],
+                                  timetables: Timetables = TIMETABLES) -> Dict[Optional[DayType], Dict[str, List[RawLesson]]]:
+    """
+    Разбирает лист один раз, а время уроков подставляет для нескольких сеток звонков.
+    Номера уроков до последнего шага остаются "символьными": от типа дня зависит
+    только сопоставление номера со звонками, все остальное (ячейки, классы, смены) общее.
+    None в day_types означает тип дня по названию листа; сетки - из timetables (см. load_timetables).
+    """
+    sheet_name = grid.name
+    day_types = list(day_types)
+    variants = {day_type: {} for day_type in day_types}
+    log.info(f"  [✓] Анализ листа '{sheet_name}'...")
+
+    # 2. Подготовка данных
+    sheet_day_types = {day_type: day_type or day_type_from_sheet_name(sheet_name) for day_type in day_types}
+    sheet_shift_hint = shift_from_sheet_name(sheet_name)
+
+    # День указан только в первой строке дня - протягиваем его вниз
+    day_rows: Dict[str, List[int]] = {}
+    current_day = ''
+    for row_idx, day_val in enumerate(grid.column_values(grid.index_of('Дни'))):
+        if day_val != '':
+            current_day = day_val
+        day_rows.setdefault(current_day, []).append(row_idx)
+
+    values = np.array(grid.rows, dtype=object).reshape(len(grid), len(grid.columns))
+    lesson_col, time_col = grid.index_of('Уроки'), grid.index_of('Время')
+    has_lesson_row = (values[:, lesson_col] != '') & (values[:, time_col] != '')
+
+    # Все пары "предмет/кабинет" разом: строки листа x классы, уже как обрезанный текст
+    class_names = list(class_column_pairs)
+    subjects = np.char.strip(values[:, [grid.index_of(subj) for subj, _ in class_column_pairs.values()]].astype(str))
+    cabinets = np.char.strip(values[:, [grid.index_of(cab) for _, cab in class_column_pairs.values()]].astype(str))
+
+    # 3. Парсинг по дням недели (в порядке сортировки названий, как и раньше)
+    for day_name in sorted(day_rows, key=str):
+        for raw_lessons_by_day in variants.values():
+            raw_lessons_by_day[day_name] = []
+
+        sheet_day_rows = np.array(day_rows[day_name])
+        grid_rows = sheet_day_rows[has_lesson_row[sheet_day_rows]]
+        if not len(grid_rows):
+            continue
 
-                first_lesson_time = next(
-                    (info['время'] for info in master_day_grid if str(info['original_row'][subject_col]).strip()),
-                    "8:00")
-                actual_shift = sheet_shift_hint or _get_shift_from_time(first_lesson_time)
+        day_subjects = subjects[grid_rows]
+        day_cabinets = cabinets[grid_rows]
+        has_subject = day_subjects != ''
+        # Классы, у которых есть хотя бы один урок, и строка первого урока каждого класса
+        class_has_lessons = has_subject.any(axis=0)
+        first_lesson_rows = has_subject.argmax(axis=0)
+
+        lesson_values = values[grid_rows, lesson_col]
+        time_values = values[grid_rows, time_col]
+        lesson_numbers = [format_lesson_number(v) for v in lesson_values]
+        bell_slots = {}  # (тип дня, смена) -> время звонков для каждой строки дня
+
+        # 4. Парсинг по классам
+        for class_idx in np.flatnonzero(class_has_lessons):
+            class_name = class_names[class_idx]
+            actual_shift = sheet_shift_hint or shift_from_time(time_values[first_lesson_rows[class_idx]])
+            # Названия предметов и кабинеты повторяются сотни раз - храним по одной копии каждой строки
+            class_cells = [
+                (sys.intern(subject) if subject else "—", clean_cabinet(cabinet))
+                for subject, cabinet in zip(day_subjects[:, class_idx].tolist(), day_cabinets[:, class_idx].tolist())
+            ]
+
+            for day_type, raw_lessons_by_day in variants.items():
+                bell_key = (sheet_day_types[day_type], actual_shift)
+                if bell_key not in bell_slots:
+                    bell_slots[bell_key] = _resolve_bell_slots(lesson_values, time_values,
+                                                               get_timetable(actual_shift, bell_key[0], timetables))
+                slots = bell_slots[bell_key]
 
                 # 5. Создание объектов RawLesson
-                for lesson_info in master_day_grid:
-                    subject = str(lesson_info['original_row'][subject_col]).strip() or "—"
-                    cabinet_raw = str(lesson_info['original_row'][cabinet_col]).strip()
-                    cabinet = cabinet_raw[:-2] if cabinet_raw.endswith('.0') else cabinet_raw
-
-                    bell_lesson = get_lesson_by_number(lesson_info['урок'], actual_shift, sheet_day_type)
-                    start_t, end_t, display_t = None, None, str(lesson_info['время'])
-                    if bell_lesson:
-                        start_t, end_t = bell_lesson.start_time, bell_lesson.end_time
-                        display_t = f"{start_t}–{end_t}"
-
-                    raw_lessons_by_day[day_name].append(RawLesson(
+                day_lessons = raw_lessons_by_day[day_name]
+                for row_idx, (subject, cabinet) in enumerate(class_cells):
+                    start_t, end_t, display_t, start_obj, end_obj = slots[row_idx]
+                    day_lessons.append(RawLesson(
                         day_name=day_name, class_name=class_name, shift=actual_shift,
-                        lesson_number=_format_lesson_number(lesson_info['урок']), display_time=display_t, subject=subject,
-                        cabinet=cabinet, start_time=start_t, end_time=end_t,
-                        start_time_obj=parse_time_str(start_t), end_time_obj=parse_time_str(end_t)
+                        lesson_number=lesson_numbers[row_idx], display_time=display_t, subject=subject, cabinet=cabinet,
+                        start_time=start_t, end_time=end_t, start_time_obj=start_obj, end_time_obj=end_obj
                     ))
 
+    return variants
+
+
+# --- Главная функция парсера ---
+
+def parse_schedule(xls: WorkbookSession, day_type_override: Optional[DayType] = None) -> Dict[str, List[RawLesson]]:
+    """
+    Главная функция парсера. Читает Excel и возвращает словарь, где
+    ключ - это день недели, а значение - плоский список всех уроков за этот день.
+    Номера уроков сопоставляются со звонками по сеткам книги (листы звонков, см. load_timetables).
+    """
+    raw_lessons_by_day: Dict[str, List[RawLesson]] = {}
+
+    log.info("Запуск парсера расписания...")
+    timetables = load_timetables(xls)
+    for sheet_name in xls.sheet_names:
+        # 1. Проверяем, подходит ли лист для парсинга
+        grid = xls.sheet(sheet_name)
+        class_column_pairs = find_schedule_layout(grid)
+        if not class_column_pairs:
+            continue
+
+        merge_lessons_by_day(raw_lessons_by_day,
+                             parse_schedule_sheet(grid, class_column_pairs, day_type_override, timetables))
+
     log.info("Парсер расписания завершил работу.")
     return raw_lessons_by_day
\ No newline at end of file
@@ -1,31 +1,59 @@
 # app/services/parsers/short_day_parser.py
 
-import pandas as pd
 import logging
-from typing import Set
+from datetime import date, datetime
+from typing import Optional, Set
+
+from app.services.utils.excel_reader import WorkbookSession
 
 
 log = logging.getLogger(__name__)
 
+# Форматы дат, которые встречаются в текстовых ячейках (день идет первым)
+_DATE_FORMATS = ('%d.%m.%Y', '%d.%m.%y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d')
+
+
+def _parse_date(value) -> Optional[date]:
+    """Дата из ячейки: настоящая дата Excel или строка вида '21.10.2025'."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        # Отрезаем время, если оно записано после даты ("21.10.2025 00:00:00")
+        text = value.strip().split(' ')[0]
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.strptime(text, fmt).date()
+            except ValueError:
+                continue
+    return None
 
-def get_short_days_from_file(xls: pd.ExcelFile) -> Set[str]:
+
+def get_short_days_from_file(xls: WorkbookSession) -> Set[str]:
     """
     Внутренняя функция для чтения дат коротких дней из файла.
     """
 
     sheet_name = next((s for s in xls.sheet_names if 'сокращ' in s.lower()), None)
-    df = pd.read_excel(xls, sheet_name=sheet_name)
+    if sheet_name is None:
+        log.warning("В файле не найден лист с сокращенными днями.")
+        return set()
 
-    if 'Дата' not in df.columns:
+    grid = xls.sheet(sheet_name)
+    date_col_idx = grid.index_of('Дата')
+    if date_col_idx is None:
         log.warning(f"На листе '{sheet_name}' не найдена колонка 'Дата'.")
         return set()
 
     dates = set()
-    for date_val in df['Дата'].dropna():
-        try:
-            parsed_date = pd.to_datetime(date_val, dayfirst=True)
+    for date_val in grid.column_values(date_col_idx):
+        if date_val == '':
+            continue
+        parsed_date = _parse_date(date_val)
+        if parsed_date:
             dates.add(parsed_date.strftime('%Y-%m-%d'))
-        except (ValueError, TypeError):
+        else:
             log.warning(f"Не удалось распознать дату '{date_val}' на листе '{sheet_name}'.")
 
-    return dates
\ No newline at end of file
+    return dates
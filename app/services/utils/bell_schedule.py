@@ -1,18 +1,41 @@
 # app/services/utils/bell_schedule.py
 
-from dataclasses import dataclass
-from typing import List, Optional, Dict
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import time
+from typing import Iterable, List, Optional, Dict, Tuple
 
+from .normalization import parse_time_str, shift_from_sheet_name, day_type_from_sheet_name
 from .enums import DayType, Shift
 
 
-@dataclass
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
 class Lesson:
     """Представляет один урок с номером, временем начала и окончания."""
     number: int
     start_time: str
     end_time: str
 
+    # Вычисляются один раз при создании, чтобы не разбирать строки времени на каждом обращении
+    start_time_obj: Optional[time] = field(init=False, repr=False, compare=False)
+    end_time_obj: Optional[time] = field(init=False, repr=False, compare=False)
+    start_minute: int = field(init=False, repr=False, compare=False)
+    end_minute: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.start_time_obj = parse_time_str(self.start_time)
+        self.end_time_obj = parse_time_str(self.end_time)
+        self.start_minute = _minute_of_day(self.start_time_obj)
+        self.end_minute = _minute_of_day(self.end_time_obj)
+
+
+def _minute_of_day(t: Optional[time]) -> int:
+    return t.hour * 60 + t.minute if t else -1
+
 
 BELLS: Dict[DayType, Dict[Shift, List[Lesson]]] = {
     DayType.NORMAL: {
@@ -66,25 +89,160 @@ BELLS: Dict[DayType, Dict[Shift, List[Lesson]]] = {
 }
 
 
-def get_lesson_by_number(lesson_number: any, shift: Shift, day_type: DayType = DayType.NORMAL) -> Optional[Lesson]:
+class BellTimetable:
     """
-    Основная функция для парсера расписания.
-    Возвращает объект Lesson по его порядковому номеру.
+    Сетка звонков одной смены и типа дня, проиндексированная один раз:
+    поиск урока по номеру и по времени начала за O(1), текущий/следующий урок - бинарным поиском.
     """
-    try:
-        num = int(float(lesson_number))
-    except (ValueError, TypeError):
-        return None
 
-    schedule = BELLS.get(day_type, {}).get(shift)
-    if not schedule:
+    def __init__(self, lessons: Iterable[Lesson]):
+        self.lessons: List[Lesson] = sorted(lessons, key=lambda l: l.start_minute)
+        self._by_number = {lesson.number: lesson for lesson in self.lessons}
+        # Время начала сравнивается как строка, в том виде, как оно записано в сетке ("8:30")
+        self._by_start_time = {lesson.start_time: lesson for lesson in self.lessons}
+        self._start_minutes = [lesson.start_minute for lesson in self.lessons]
+
+    def __len__(self) -> int:
+        return len(self.lessons)
+
+    def by_number(self, lesson_number: any) -> Optional[Lesson]:
+        """Урок по номеру; номер может быть числом или строкой ("3", 3.0)."""
+        try:
+            return self._by_number.get(int(float(lesson_number)))
+        except (ValueError, TypeError):
+            return None
+
+    def by_start_time(self, start_time: str) -> Optional[Lesson]:
+        return self._by_start_time.get(start_time)
+
+    def current_lesson(self, at: time) -> Optional[Lesson]:
+        """Урок, который идет в момент at (начало включительно, конец - нет)."""
+        minute = _minute_of_day(at)
+        idx = bisect_right(self._start_minutes, minute) - 1
+        if idx >= 0 and minute < self.lessons[idx].end_minute:
+            return self.lessons[idx]
         return None
 
-    for lesson in schedule:
-        if lesson.number == num:
-            return lesson
+    def next_lesson(self, at: time) -> Optional[Lesson]:
+        """Ближайший урок, который начнется после момента at."""
+        idx = bisect_right(self._start_minutes, _minute_of_day(at))
+        return self.lessons[idx] if idx < len(self.lessons) else None
+
+    def current_and_next(self, at: time) -> Tuple[Optional[Lesson], Optional[Lesson]]:
+        return self.current_lesson(at), self.next_lesson(at)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[any, any, any]]) -> "BellTimetable":
+        """
+        Сетка из строк (номер, начало, конец). Время может быть строкой "8.30"/"8:30"
+        или объектом time; строки без номера или с нераспознанным временем пропускаются.
+        """
+        lessons = []
+        for number, start, end in rows:
+            start_obj = start if isinstance(start, time) else parse_time_str(start)
+            end_obj = end if isinstance(end, time) else parse_time_str(end)
+            try:
+                lesson_number = int(float(number))
+            except (ValueError, TypeError):
+                continue
+            if start_obj and end_obj:
+                lessons.append(Lesson(number=lesson_number, start_time=_format_time(start_obj),
+                                      end_time=_format_time(end_obj)))
+        return cls(lessons)
+
+    @classmethod
+    def from_grid(cls, grid) -> "BellTimetable":
+        """
+        Сетка из листа книги (SheetGrid). Ожидаются колонки 'Урок' (или '№') и либо 'Начало'/'Конец',
+        либо одна колонка 'Время' с диапазоном "8.30-9.10".
+        """
+        columns = {str(col).strip().lower(): idx for idx, col in enumerate(grid.columns)}
+        number_idx = next((idx for name, idx in columns.items() if 'урок' in name or name == '№'), None)
+        start_idx, end_idx = columns.get('начало'), columns.get('конец')
+        time_idx = columns.get('время')
+        if number_idx is None or ((start_idx is None or end_idx is None) and time_idx is None):
+            return cls([])
+
+        rows = []
+        for row in grid.rows:
+            if start_idx is not None and end_idx is not None:
+                rows.append((row[number_idx], row[start_idx], row[end_idx]))
+            else:
+                start, _, end = str(row[time_idx]).replace('–', '-').partition('-')
+                rows.append((row[number_idx], start.strip(), end.strip()))
+        return cls.from_rows(rows)
+
+
+def _format_time(t: time) -> str:
+    """Время в формате сетки звонков: без ведущего нуля в часах ("8:30")."""
+    return f"{t.hour}:{t.minute:02d}"
+
+
+Timetables = Dict[DayType, Dict[Shift, BellTimetable]]
+
+# Индексированные сетки, построенные из BELLS один раз при импорте
+TIMETABLES: Timetables = {
+    day_type: {shift: BellTimetable(lessons) for shift, lessons in shifts.items()}
+    for day_type, shifts in BELLS.items()
+}
+
+
+def get_timetable(shift: Shift, day_type: DayType = DayType.NORMAL,
+                  timetables: Timetables = TIMETABLES) -> Optional[BellTimetable]:
+    """Сетка звонков для смены и типа дня или None, если такой нет."""
+    return timetables.get(day_type, {}).get(shift)
+
+
+def is_bell_sheet(sheet_name: str) -> bool:
+    """Лист со своей сеткой звонков: "Звонки (1 смена)", "Звонки (2 смена) (сокр)"."""
+    return 'звонк' in str(sheet_name).strip().lower()
+
+
+def load_timetables(xls) -> Timetables:
+    """
+    Сетки звонков для книги (WorkbookSession). Лист звонков заменяет сетку своей смены и типа дня
+    (по названию листа, как у листов расписания; без смены - первая), остальные сетки берутся из BELLS.
+    Если листов звонков нет, возвращается сам TIMETABLES.
+    """
+    bell_sheets = [sheet_name for sheet_name in xls.sheet_names if is_bell_sheet(sheet_name)]
+    if not bell_sheets:
+        return TIMETABLES
+
+    timetables = {day_type: dict(shifts) for day_type, shifts in TIMETABLES.items()}
+    for sheet_name in bell_sheets:
+        timetable = BellTimetable.from_grid(xls.sheet(sheet_name))
+        if not timetable:
+            log.warning(f"  [!] Лист звонков '{sheet_name}' не распознан, используется встроенная сетка.")
+            continue
+        day_type = day_type_from_sheet_name(sheet_name)
+        shift = shift_from_sheet_name(sheet_name) or Shift.FIRST
+        timetables.setdefault(day_type, {})[shift] = timetable
+        log.info(f"  [✓] Сетка звонков ({shift.value}, {day_type.name}) взята с листа '{sheet_name}'.")
+    return timetables
+
+
+def timetables_to_rows(timetables: Timetables) -> Dict[str, Dict[str, List[list]]]:
+    """Сетки в компактном виде для кэша: {тип дня: {смена: [[номер, начало, конец], ...]}}."""
+    return {day_type.name: {shift.name: [[l.number, l.start_time, l.end_time] for l in timetable.lessons]
+                            for shift, timetable in shifts.items()}
+            for day_type, shifts in timetables.items()}
 
-    return None
+
+def timetables_from_rows(rows: Optional[dict]) -> Timetables:
+    """Обратное к timetables_to_rows; без данных (старый кэш) - встроенные сетки."""
+    if not rows:
+        return TIMETABLES
+    return {DayType[day_type]: {Shift[shift]: BellTimetable.from_rows(lessons) for shift, lessons in shifts.items()}
+            for day_type, shifts in rows.items()}
+
+
+def get_lesson_by_number(lesson_number: any, shift: Shift, day_type: DayType = DayType.NORMAL) -> Optional[Lesson]:
+    """
+    Основная функция для парсера расписания.
+    Возвращает объект Lesson по его порядковому номеру.
+    """
+    timetable = get_timetable(shift, day_type)
+    return timetable.by_number(lesson_number) if timetable else None
 
 
 def get_end_time(start_time: str, shift: Shift, day_type: DayType = DayType.NORMAL) -> Optional[str]:
@@ -92,12 +250,6 @@ def get_end_time(start_time: str, shift: Shift, day_type: DayType = DayType.NORM
     Восстановлена для обратной совместимости с парсером консультаций.
     Находит время окончания по времени начала.
     """
-    schedule = BELLS.get(day_type, {}).get(shift)
-    if not schedule:
-        return None
-
-    for lesson in schedule:
-        if lesson.start_time == start_time:
-            return lesson.end_time
-
-    return None
\ No newline at end of file
+    timetable = get_timetable(shift, day_type)
+    lesson = timetable.by_start_time(start_time) if timetable else None
+    return lesson.end_time if lesson else None
@@ -1,25 +1,238 @@
 # app/services/utils/excel_reader.py
 
-import pandas as pd
+import hashlib
 import logging
-from typing import Optional
+import os
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from python_calamine import CalamineWorkbook
+
+from .lru_cache import LRUCache
 
 
 log = logging.getLogger(__name__)
 
+# Недавно открытые книги. Ключ - (устройство, inode) файла, версия - (размер, mtime),
+# поэтому книга, проверенная во временном файле и затем переименованная, не декодируется повторно.
+_recent_workbooks = LRUCache(max_size=4)
+
 
-def open_excel_file(file_path: str) -> Optional[pd.ExcelFile]:
+def open_excel_file(file_path: str) -> Optional[CalamineWorkbook]:
     """
-    Безопасно открывает Excel-файл и возвращает объект ExcelFile.
+    Безопасно открывает Excel-файл и возвращает объект книги calamine.
     Возвращает None в случае ошибки.
     """
     try:
         log.info(f"Открытие Excel-файла как объекта: {file_path}")
-        xls = pd.ExcelFile(file_path, engine='calamine')
-        return xls
+        return CalamineWorkbook.from_path(file_path)
     except FileNotFoundError:
         log.error(f"Файл не найден по пути: {file_path}")
         return None
     except Exception as e:
         log.error(f"Не удалось открыть Excel-файл '{file_path}'. Ошибка: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def _convert_cell(value):
+    """Целые числа Excel хранит как float: 101.0 -> 101, остальные значения оставляем как есть."""
+    if isinstance(value, float):
+        int_value = int(value)
+        return int_value if int_value == value else value
+    return value
+
+
+def _fill_header_row(row: list, control_row: List[bool]) -> list:
+    """
+    Протягивает значения объединенных ячеек заголовка вправо,
+    но не через границу группы верхнего уровня.
+    """
+    last = row[0]
+    for i in range(1, len(row)):
+        if not control_row[i]:
+            last = row[i]
+        if row[i] == "":
+            row[i] = last
+        else:
+            control_row[i] = False
+            last = row[i]
+    return row
+
+
+def _dedup_names(names: list) -> list:
+    """Повторяющиеся имена колонок получают суффиксы '.1', '.2', ..."""
+    counts: Dict = {}
+    result = []
+    for name in names:
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        counts[name] = count + 1
+        result.append(name)
+    return result
+
+
+class SheetGrid:
+    """
+    Лист Excel как простая таблица: строки заголовка превращены в имена колонок,
+    данные - списки значений ячеек (пустая ячейка - '').
+    При двух строках заголовка имя колонки - кортеж (верхний уровень, нижний уровень).
+    Объект общий для всех потребителей сессии, поэтому его нельзя изменять.
+    """
+
+    def __init__(self, name: str, cells: List[list], header_rows: int = 1):
+        self.name = name
+        header, rows = cells[:header_rows], cells[header_rows:]
+
+        if header_rows == 1:
+            names = header[0] if header else []
+            self.columns = _dedup_names([f"Unnamed: {i}" if c == "" else c for i, c in enumerate(names)])
+        else:
+            header = [list(row) for row in header]
+            control_row = [True] * (len(header[0]) if header else 0)
+            for row in header:
+                _fill_header_row(row, control_row)
+            self.columns = [
+                tuple(f"Unnamed: {i}_level_{level}" if c == "" else c for level, c in enumerate(column))
+                for i, column in enumerate(zip(*header))
+            ]
+            # Полностью пустая строка сразу под многоуровневым заголовком не считается данными
+            if rows and all(c == "" for c in rows[0]):
+                rows = rows[1:]
+
+        self.rows: List[list] = rows
+        self._index = {}
+        for i, column in enumerate(self.columns):
+            self._index.setdefault(column, i)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def index_of(self, column) -> Optional[int]:
+        """Номер колонки по имени или None."""
+        return self._index.get(column)
+
+    def column_values(self, index: int) -> list:
+        """Значения одной колонки по всем строкам данных."""
+        return [row[index] for row in self.rows]
+
+
+class WorkbookSession:
+    """
+    Книга Excel, декодированная один раз: ячейки каждого листа читаются из файла
+    при открытии, а все потребители (проверка структуры, парсеры, сравнение)
+    получают из них готовые SheetGrid без повторного чтения.
+    """
+
+    def __init__(self, workbook: CalamineWorkbook):
+        self.sheet_names: List[str] = list(workbook.sheet_names)
+        self._cells: Dict[str, List[list]] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._grids: Dict[Tuple[str, int], SheetGrid] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._sheets_read = set()
+        self._lock = Lock()
+        self._decodes = 0
+        self._reads = 0
+        self._decodes_avoided = 0
+        self._grids_reused = 0
+
+        for sheet_name in self.sheet_names:
+            try:
+                # Читаем лист с ячейки A1, как и раньше, даже если первые строки/колонки пустые
+                rows = workbook.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+                self._cells[sheet_name] = [[_convert_cell(cell) for cell in row] for row in rows]
+            except Exception as e:
+                # Ошибку листа отдаем тому, кто его запросит
+                self._errors[sheet_name] = e
+            self._decodes += 1
+
+    def sheet(self, sheet_name: str, header_rows: int = 1) -> SheetGrid:
+        """Лист как SheetGrid с заданным числом строк заголовка."""
+        if sheet_name in self._errors:
+            raise self._errors[sheet_name]
+        if sheet_name not in self._cells:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+        key = (sheet_name, header_rows)
+        with self._lock:
+            self._reads += 1
+            if sheet_name in self._sheets_read:
+                self._decodes_avoided += 1
+            self._sheets_read.add(sheet_name)
+
+            grid = self._grids.get(key)
+            if grid is None:
+                grid = self._grids[key] = SheetGrid(sheet_name, self._cells[sheet_name], header_rows)
+            else:
+                self._grids_reused += 1
+        return grid
+
+    def sheet_fingerprint(self, sheet_name: str) -> str:
+        """
+        Отпечаток содержимого листа (хэш всех ячеек вместе с названием листа).
+        Одинаковый отпечаток означает, что лист не менялся и результат его разбора можно переиспользовать.
+        """
+        if sheet_name in self._errors:
+            raise self._errors[sheet_name]
+        fingerprint = self._fingerprints.get(sheet_name)
+        if fingerprint is None:
+            raw = repr((sheet_name, self._cells[sheet_name])).encode('utf-8')
+            fingerprint = self._fingerprints[sheet_name] = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        return fingerprint
+
+    def stats(self) -> dict:
+        """Статистика сессии: сколько листов декодировано и сколько повторных декодирований удалось избежать."""
+        with self._lock:
+            return {
+                "sheets": len(self.sheet_names),
+                "sheet_decodes": self._decodes,
+                "sheet_reads": self._reads,
+                "decodes_avoided": self._decodes_avoided,
+                "grids_reused": self._grids_reused,
+            }
+
+
+def open_workbook(file_path: str) -> Optional[WorkbookSession]:
+    """
+    Открывает книгу как WorkbookSession. Если этот же файл (тот же inode, размер и mtime)
+    уже был открыт недавно, возвращает ту же сессию без повторного декодирования.
+    Возвращает None в случае ошибки.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        st = None
+
+    if st is not None:
+        session = _recent_workbooks.get((st.st_dev, st.st_ino), (st.st_size, st.st_mtime_ns))
+        if session is not None:
+            log.info(f"Книга '{file_path}' уже декодирована, используем готовую сессию.")
+            return session
+
+    workbook = open_excel_file(file_path)
+    if not workbook:
+        return None
+    try:
+        session = WorkbookSession(workbook)
+    except Exception as e:
+        log.error(f"Не удалось прочитать Excel-файл '{file_path}'. Ошибка: {e}")
+        return None
+    finally:
+        workbook.close()
+
+    if st is not None:
+        _recent_workbooks.put((st.st_dev, st.st_ino), session, (st.st_size, st.st_mtime_ns))
+    return session
+
+
+def release_workbook(*file_paths: str) -> None:
+    """Освобождает декодированные книги этих файлов (вызывается после завершения обновления)."""
+    for file_path in file_paths:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        _recent_workbooks.pop((st.st_dev, st.st_ino))
@@ -0,0 +1,87 @@
+# app/services/utils/file_lock.py
+
+import logging
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+log = logging.getLogger(__name__)
+
+
+class FileLock:
+    """
+    Межпроцессная блокировка на основе lock-файла (flock на Linux, msvcrt на Windows).
+    Каждый захват открывает собственный дескриптор, поэтому блокировка работает
+    и между потоками одного процесса, и между воркерами gunicorn.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.1):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Захватывает блокировку. При blocking=False сразу возвращает False, если она занята."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            while True:
+                if self._try_lock(fd):
+                    self._fd = fd
+                    return True
+                if not blocking:
+                    os.close(fd)
+                    return False
+                if fcntl:
+                    # На Linux можно просто ждать внутри flock
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                    self._fd = fd
+                    return True
+                time.sleep(self.poll_interval)
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        except OSError as e:
+            log.warning(f"Не удалось снять блокировку '{self.path}': {e}")
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @staticmethod
+    def _try_lock(fd: int) -> bool:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except (BlockingIOError, PermissionError):
+            return False
+        except OSError:
+            # msvcrt сообщает о занятой блокировке обычным OSError
+            if fcntl:
+                raise
+            return False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
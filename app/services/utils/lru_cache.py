@@ -0,0 +1,64 @@
+# app/services/utils/lru_cache.py
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Потокобезопасный LRU-кэш ограниченного размера со счетчиками попаданий и промахов.
+    Каждая запись может хранить "версию": если запрошенная версия не совпадает
+    с сохраненной, запись считается устаревшей (промах).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Any = None) -> Optional[Any]:
+        """Возвращает значение по ключу или None, если его нет или версия устарела."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, version: Any = None) -> None:
+        """Сохраняет значение, вытесняя самую давно использованную запись при переполнении."""
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def items(self) -> List[Tuple[Hashable, Any, Any]]:
+        """Снимок записей (ключ, значение, версия) от самой старой к самой свежей; счетчики не меняются."""
+        with self._lock:
+            return [(key, value, version) for key, (version, value) in self._entries.items()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Статистика кэша для логов и диагностики."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,135 @@
+# app/services/utils/normalization.py
+
+import re
+import sys
+from datetime import time
+from functools import lru_cache
+from typing import Optional
+
+from .enums import DayType, Shift
+
+
+# Значения ячеек (имена классов, номера уроков, время, кабинеты) повторяются на всех листах и во всех
+# обновлениях, поэтому каждое преобразование запоминается в ограниченном кэше и выполняется один раз.
+# typed=True: 1 и 1.0 - разные ячейки, и строковое представление у них разное.
+
+# Имя класса: начинается с 1-11, далее опциональный пробел, затем буква и любые символы ('11ИП(наука)')
+_CLASS_NAME_RE = re.compile(r'^(10|11|[1-9])\s?[А-Яа-яЁёA-Za-z].*$')
+_CLASS_NAME_JOINED_RE = re.compile(r'^(10|11|[1-9])([А-Яа-яЁёA-Za-z].*)$')
+_TIME_RE = re.compile(r'(\d{1,2})[.:](\d{2})')
+_LEADING_DIGITS_RE = re.compile(r'(\d+)')
+
+
+@lru_cache(maxsize=1024, typed=True)
+def is_valid_class_name(s: str) -> bool:
+    """
+    Проверяет, соответствует ли строка формату имени класса.
+    Требует, чтобы имя начиналось с цифры (1-11), за которой следует хотя бы одна буква.
+    """
+    return _CLASS_NAME_RE.fullmatch(str(s).strip()) is not None
+
+
+@lru_cache(maxsize=1024, typed=True)
+def normalize_class_name(s: str) -> str:
+    """
+    Нормализует имя класса, добавляя пробел между цифрой и остальной частью, если его нет.
+    Пример: '11ИП(наука)' -> '11 ИП(наука)'
+    """
+    s = str(s).strip()
+    match = _CLASS_NAME_JOINED_RE.match(s)
+    if match:
+        num, rest = match.groups()
+        return sys.intern(f"{num} {rest}")
+    return sys.intern(s)  # Пробел уже есть или формат неожиданный - возвращаем как есть
+
+
+@lru_cache(maxsize=4096, typed=True)
+def parse_time_str(time_str: str) -> Optional[time]:
+    """Парсит время из строки ("8.30", "13:25", "8.30-9.10" - берется начало)."""
+    match = _TIME_RE.match(str(time_str))
+    if match:
+        h, m = map(int, match.groups())
+        if 0 <= h < 24 and 0 <= m < 60:
+            return time(h, m)
+    return None
+
+
+@lru_cache(maxsize=1024, typed=True)
+def format_lesson_number(val: any) -> str:
+    """Номер урока из ячейки как строка: 3.0 -> '3', '4' -> '4', '5.5' -> '5.5'."""
+    try:
+        float_val = float(val)
+        if float_val.is_integer():
+            return sys.intern(str(int(float_val)))
+        return sys.intern(str(val))
+    except (ValueError, TypeError):
+        return sys.intern(str(val).split('.')[0])
+
+
+@lru_cache(maxsize=1024, typed=True)
+def shift_from_time(time_str: str) -> Shift:
+    """Смена по времени первого урока: с 12 часов - вторая."""
+    try:
+        hour_str = time_str.split('.')[0].split(':')[0]
+        hour = int(_LEADING_DIGITS_RE.match(hour_str).group(1))
+        return Shift.SECOND if hour >= 12 else Shift.FIRST
+    except (ValueError, IndexError, AttributeError):
+        return Shift.FIRST
+
+
+def shift_from_sheet_name(sheet_name: str) -> Optional[Shift]:
+    """Смена по названию листа ("... (1 смена)", "... (2 смена)") или None, если она не указана."""
+    clean_name = str(sheet_name).strip().lower()
+    if re.search(r'\(1\s?смена\)', clean_name): return Shift.FIRST
+    if re.search(r'\(2\s?смена\)', clean_name): return Shift.SECOND
+    return None
+
+
+def day_type_from_sheet_name(sheet_name: str) -> DayType:
+    """Тип дня по названию листа: "(сокр)" - сокращенный, иначе обычный."""
+    clean_name = str(sheet_name).strip().lower()
+    if re.search(r'\(сокр\)', clean_name):
+        return DayType.SHORT
+    return DayType.NORMAL
+
+
+@lru_cache(maxsize=4096)
+def clean_cabinet(cabinet: str) -> str:
+    """Кабинет урока (уже обрезанный текст): числовой хвост '.0' отбрасывается ('101.0' -> '101')."""
+    return sys.intern(cabinet[:-2] if cabinet.endswith('.0') else cabinet)
+
+
+@lru_cache(maxsize=4096)
+def clean_room(room: str) -> str:
+    """Кабинет консультации (уже обрезанный текст): без '.0', пустое значение - '—'."""
+    room = room.replace('.0', '')
+    if not room or room == 'nan':
+        return '—'
+    return sys.intern(room)
+
+
+_MEMOIZED = {
+    "is_valid_class_name": is_valid_class_name,
+    "normalize_class_name": normalize_class_name,
+    "parse_time_str": parse_time_str,
+    "format_lesson_number": format_lesson_number,
+    "shift_from_time": shift_from_time,
+    "clean_cabinet": clean_cabinet,
+    "clean_room": clean_room,
+}
+
+
+def get_normalization_stats() -> dict:
+    """Статистика кэшей нормализации (в том же виде, что и у LRUCache)."""
+    stats = {}
+    for name, func in _MEMOIZED.items():
+        info = func.cache_info()
+        total = info.hits + info.misses
+        stats[name] = {
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / total, 3) if total else 0.0,
+        }
+    return stats
@@ -1,9 +1,9 @@
 # app/services/utils/schedule_comparator.py
 
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 
-from .excel_reader import open_excel_file
+from .excel_reader import open_workbook, WorkbookSession
 from .enums import DayType
 
 from app.services.parsers.schedule_parser import parse_schedule
@@ -13,15 +13,16 @@ from app.services.parsers.schedule_parser import parse_schedule
 log = logging.getLogger(__name__)
 
 
-def _get_lessons_as_dict(file_path: str) -> Dict[Tuple[str, str, Any], Dict[str, str]]:
+def _get_lessons_as_dict(file_path: str, workbook: Optional[WorkbookSession] = None) -> Dict[Tuple[str, str, Any], Dict[str, str]]:
     """
     Вспомогательная функция.
     Парсит Excel-файл и преобразует его в плоский словарь для легкого сравнения.
+    Если книга уже открыта (workbook), файл повторно не читается.
     """
     flat_lessons = {}
 
     # --- ИЗМЕНЕНИЕ: Используем наш excel_reader ---
-    xls = open_excel_file(file_path)
+    xls = workbook or open_workbook(file_path)
     if not xls:
         # excel_reader уже залогировал ошибку, здесь просто выходим
         return {}
@@ -40,24 +41,22 @@ def _get_lessons_as_dict(file_path: str) -> Dict[Tuple[str, str, Any], Dict[str,
     except Exception as e:
         log.error(f"Ошибка при парсинге файла для сравнения '{file_path}': {e}", exc_info=True)
         return {}
-    finally:
-        # Всегда закрываем открытый файл
-        if xls:
-            xls.close()
 
     return flat_lessons
 
 
-def compare_schedules(old_file_path: str, new_file_path: str) -> Dict[str, list]:
+def compare_schedules(old_file_path: str, new_file_path: str,
+                      new_workbook: Optional[WorkbookSession] = None) -> Dict[str, list]:
     """
     Сравнивает два файла расписания и возвращает словарь с изменениями.
+    new_workbook - уже открытая сессия нового файла, чтобы не декодировать его второй раз.
     """
     # ... весь остальной код этой функции остается без изменений ...
     # Он написан абсолютно правильно.
     log.info(f"Начинаю сравнение расписаний: '{old_file_path}' (старый) и '{new_file_path}' (новый)")
 
     old_lessons = _get_lessons_as_dict(old_file_path)
-    new_lessons = _get_lessons_as_dict(new_file_path)
+    new_lessons = _get_lessons_as_dict(new_file_path, new_workbook)
 
     # Если один из файлов не удалось распарсить, сравнение невозможно
     if not old_lessons or not new_lessons:
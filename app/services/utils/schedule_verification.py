@@ -2,7 +2,6 @@
 
 import logging
 import re
-import pandas as pd
 
 from . import excel_reader
 
@@ -37,7 +36,7 @@ def verify_schedule_file(file_path: str) -> bool:
     """
     log.info(f"Запущена строгая проверка структуры для файла: {file_path}")
 
-    xls = excel_reader.open_excel_file(file_path)
+    xls = excel_reader.open_workbook(file_path)
     if not xls:
         return False
 
@@ -70,16 +69,16 @@ def verify_schedule_file(file_path: str) -> bool:
             try:
                 if sheet_type_found == "Консультации":
                     # --- ОСОБАЯ ПРОВЕРКА ДЛЯ КОНСУЛЬТАЦИЙ ---
-                    df = pd.read_excel(xls, sheet_name=sheet_name, header=[0, 1])
+                    grid = xls.sheet(sheet_name, header_rows=2)
                     # Превращаем двухуровневые заголовки в плоскую строку для поиска
-                    flat_columns = {" ".join(map(str, col)).lower() for col in df.columns}
+                    flat_columns = {" ".join(map(str, col)).lower() for col in grid.columns}
                     # Проверяем, есть ли хотя бы одна колонка, содержащая 'учитель' или 'фио'
                     if any('учитель' in col or 'фио' in col for col in flat_columns):
                         is_valid = True
                 else:
                     # --- СТАНДАРТНАЯ ПРОВЕРКА ДЛЯ ОСТАЛЬНЫХ ЛИСТОВ ---
-                    df = pd.read_excel(xls, sheet_name=sheet_name)
-                    sheet_columns = {str(col).lower() for col in df.columns}
+                    grid = xls.sheet(sheet_name)
+                    sheet_columns = {str(col).lower() for col in grid.columns}
                     if contract['columns'].issubset(sheet_columns):
                         is_valid = True
             except Exception as e:
@@ -106,7 +105,4 @@ def verify_schedule_file(file_path: str) -> bool:
 
     except Exception as e:
         log.error(f"Произошла непредвиденная ошибка во время верификации файла '{file_path}': {e}", exc_info=True)
-        return False
-    finally:
-        if xls:
-            xls.close()
\ No newline at end of file
+        return False
\ No newline at end of file
@@ -1,7 +1,8 @@
 // main.js - Финальная версия
 document.addEventListener('DOMContentLoaded', () => {
     // --- Константы и переменные ---
-    const { activeDayName, currentTime, refreshInterval, scheduleName } = window.APP_DATA;
+    const { activeDayName, currentTime, refreshInterval, scheduleName, viewEventsEnabled } = window.APP_DATA;
+    let { viewVersion, dataVersion } = window.APP_DATA;
     const gradeSelector = document.getElementById('grade-selector');
     const classSelector = document.getElementById('class-selector');
     const scheduleDisplay = document.getElementById('schedule-display');
@@ -11,6 +12,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const sideNavRight = document.getElementById('side-nav-right');
     const timePortrait = document.getElementById('live-time-portrait');
     const timeLandscape = document.getElementById('live-time-landscape');
+    const bellStatusLandscape = document.getElementById('bell-status-landscape');
     const scheduleContent = document.getElementById('schedule-content');
     const consultationContent = document.getElementById('consultation-content');
     const showScheduleBtn = document.getElementById('show-schedule-btn');
@@ -23,10 +25,15 @@ document.addEventListener('DOMContentLoaded', () => {
     const viewToggleWrapper = document.getElementById('view-toggle-wrapper');
     const loadingSpinner = document.getElementById('loading-spinner');
     const promptContent = document.getElementById('prompt-content');
+    const landscapeBody = document.getElementById('landscape-body');
     let fullSchedule = null, allConsultations = null;
     let hours, minutes, seconds, timeDifference = 0;
     const initialScheduleDisplayHTML = scheduleDisplay.innerHTML;
     const STORAGE_KEY_GRADE = 'selectedGrade', STORAGE_KEY_CLASS = 'selectedClass';
+    // Режим киоска (?kiosk=1): сервер сам присылает изменения через SSE, опрос не нужен.
+    // Если на сервере канал выключен (VIEW_EVENTS_ENABLED), киоск, как и обычная страница, опрашивает /api/view
+    const isKioskMode = new URLSearchParams(window.location.search).has('kiosk');
+    let pollingTimer = null;
 
     async function main() {
         if (loadingSpinner && promptContent) { promptContent.style.display = 'none'; loadingSpinner.style.display = 'block'; }
@@ -51,7 +58,11 @@ document.addEventListener('DOMContentLoaded', () => {
             animatePromptItems();
         }
         updateContentSpacer();
-        setInterval(refreshDataOnTheFly, refreshInterval * 1000)
+        if (isKioskMode && viewEventsEnabled && window.EventSource) {
+            subscribeToViewEvents();
+        } else {
+            startPolling();
+        }
     }
 
     function setupGlobalListeners() {
@@ -136,6 +147,11 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function setupConsultationUI() {
+        populateConsultationDays();
+        backToDaysBtn.addEventListener('click', showDaySelectorView);
+    }
+
+    function populateConsultationDays() {
         const daysOrder = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота"];
         consultationDaySelector.innerHTML = '';
         daysOrder.forEach((day, index) => {
@@ -150,7 +166,6 @@ document.addEventListener('DOMContentLoaded', () => {
                 consultationDaySelector.appendChild(dayBtn);
             }
         });
-        backToDaysBtn.addEventListener('click', showDaySelectorView);
     }
 
     function showConsultationsForDay(day) {
@@ -351,14 +366,22 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function setupClock() {
-        const serverTimeParts = currentTime.split(':').map(Number);
-        const serverDate = new Date();
-        serverDate.setHours(serverTimeParts[0], serverTimeParts[1], serverTimeParts[2]);
-        timeDifference = serverDate.getTime() - new Date().getTime();
+        syncClock(currentTime);
         updateClock();
         setInterval(updateClock, 1000);
     }
 
+    // Разница с часами сервера ("ЧЧ:ММ:СС"). Пересчитывается при каждом ответе /api/view и событии,
+    // иначе часы экрана, который не перезагружается сутками, постепенно уходят
+    function syncClock(serverTime) {
+        const serverTimeParts = serverTime.split(':').map(Number);
+        const serverDate = new Date();
+        serverDate.setHours(serverTimeParts[0], serverTimeParts[1], serverTimeParts[2]);
+        const dayMs = 24 * 60 * 60 * 1000;
+        // Около полуночи у клиента и сервера могут быть разные даты: разница - не больше полусуток
+        timeDifference = ((serverDate.getTime() - new Date().getTime()) % dayMs + dayMs * 1.5) % dayMs - dayMs / 2;
+    }
+
     let loadedDay = null;
 
     function updateClock() {
@@ -435,10 +458,97 @@ document.addEventListener('DOMContentLoaded', () => {
         return match ? parseInt(match[1], 10) * 60 + parseInt(match[2], 10) : null;
     }
 
-    // Добавляем эту новую функцию в твой main.js
+    // Страница не перезагружается: сервер по версии отвечает "без изменений",
+    // списком появившихся/исчезнувших слайдов или (новые данные, другой день) телом целиком
+    async function refreshDataOnTheFly(since = viewVersion) {
+        try {
+            const response = await fetch(`/api/view/${scheduleName}?since=${encodeURIComponent(since)}`, { cache: 'no-store' });
+            if (!response.ok) return;
+            await applyViewUpdate(await response.json());
+        } catch (error) {
+            console.error("View refresh error:", error);
+        }
+    }
+
+    function startPolling() {
+        if (!pollingTimer) pollingTimer = setInterval(refreshDataOnTheFly, refreshInterval * 1000);
+    }
 
-    async function refreshDataOnTheFly() {
-        window.location.reload();
+    function subscribeToViewEvents() {
+        const source = new EventSource(`/api/events/${scheduleName}?since=${encodeURIComponent(viewVersion)}`);
+        source.addEventListener('view', event => {
+            applyViewUpdate(JSON.parse(event.data)).catch(error => console.error("View event error:", error));
+        });
+        source.addEventListener('error', () => {
+            // Обрыв связи браузер переподключает сам (присылая Last-Event-ID), а закрытый
+            // сервером поток (нет мест, ошибка) уже не восстановится - переходим на опрос
+            if (source.readyState === EventSource.CLOSED) startPolling();
+        });
+    }
+
+    async function applyViewUpdate(view) {
+        if (view.server_time) syncClock(view.server_time);
+        if (!view.changed) return;
+        if (bellStatusLandscape) bellStatusLandscape.textContent = view.bell_status || '';
+        if (view.patch) {
+            if (!applyViewPatch(view.patch)) {
+                // Страница разошлась с версией - просим тело целиком
+                await refreshDataOnTheFly('');
+                return;
+            }
+        } else {
+            replaceViewBody(view.html);
+        }
+        viewVersion = view.version;
+        if (view.data_version !== dataVersion) {
+            dataVersion = view.data_version;
+            await reloadPortraitData();
+        }
+        highlightCurrentItems();
+    }
+
+    function applyViewPatch(patch) {
+        const inner = landscapeBody?.querySelector('#scheduleCarousel .carousel-inner');
+        if (!inner) return false;
+        const shown = new Map(Array.from(inner.children).map(item => [item.dataset.slideKey, item]));
+        const template = document.createElement('template');
+        const items = [];
+        for (const key of patch.slides) {
+            let item = shown.get(key);
+            if (key in patch.added) {
+                template.innerHTML = patch.added[key].trim();
+                item = template.content.firstElementChild;
+            }
+            if (!item) return false;
+            items.push(item);
+        }
+        patch.removed.forEach(key => shown.get(key)?.remove());
+        Array.from(inner.children).forEach(item => { if (!items.includes(item)) item.remove(); });
+        // Оставшиеся слайды переставляются в новом порядке, новые вставляются на свои места
+        items.forEach(item => inner.appendChild(item));
+        if (!inner.querySelector(':scope > .carousel-item.active')) inner.firstElementChild.classList.add('active');
+        items.forEach((item, slideIndex) => {
+            item.querySelectorAll('table[id^="lessons-table-"]').forEach((table, index) => { table.id = `lessons-table-${slideIndex}-${index}`; });
+        });
+        return true;
+    }
+
+    function replaceViewBody(html) {
+        const oldCarousel = document.getElementById('scheduleCarousel');
+        if (oldCarousel && window.bootstrap) bootstrap.Carousel.getInstance(oldCarousel)?.dispose();
+        landscapeBody.innerHTML = html;
+        const carousel = document.getElementById('scheduleCarousel');
+        if (carousel && window.bootstrap) bootstrap.Carousel.getOrCreateInstance(carousel).cycle();
+    }
+
+    // Новые данные в кэше: портретному режиму нужны свежие неделя и консультации
+    async function reloadPortraitData() {
+        [fullSchedule, allConsultations] = await Promise.all([ fetch(`/api/schedule/${scheduleName}`).then(res => res.json()), fetch(`/api/consultations/${scheduleName}`).then(res => res.json()) ]);
+        populateConsultationDays();
+        const selectedClass = classSelector.value;
+        if (selectedClass && selectedClass !== '--' && !classSelector.disabled && portraitView.classList.contains('schedule-selected')) {
+            displayWeekSchedule(selectedClass, false);
+        }
     }
 
     main();
@@ -0,0 +1,71 @@
+# app/view_fragments.py
+
+from typing import Dict, Iterable, Optional
+
+from flask import render_template, get_template_attribute
+from markupsafe import Markup
+
+from config import Config
+from .services.core import display_state, fragment_cache
+from .services.core.display_state import DisplayState, CONSULTATIONS_SLIDE_KEY
+
+
+def render_schedule_body(schedule_name: str, state: DisplayState) -> Markup:
+    """Тело ландшафтного режима для состояния экрана (из кэша фрагментов)."""
+    return fragment_cache.get_or_render((schedule_name, "body") + state.key, lambda: render_template(
+        '_landscape_body.html',
+        schedule_for_today=state.schedule_for_today,
+        consultations_for_today=state.consultations_for_today,
+        slide_keys=state.slide_keys,
+        active_day_name=state.day_name,
+        carousel_interval=Config.CAROUSEL_INTERVAL,
+        lessons_are_over=state.lessons_are_over,
+        is_weekend=state.is_weekend,
+    ))
+
+
+def render_slides(schedule_name: str, state: DisplayState, keys: Iterable[str]) -> Dict[str, Markup]:
+    """
+    Отдельные слайды карусели по ключам (для правки страницы на месте).
+    Слайды рендерятся неактивными: активный слайд выбирает клиент.
+    """
+    slide_index = {key: i for i, key in enumerate(state.slide_keys)}
+    slides = {}
+    for key in keys:
+        i = slide_index[key]
+        if key == CONSULTATIONS_SLIDE_KEY:
+            render = lambda: get_template_attribute('_landscape_slides.html', 'consultations_slide')(
+                state.consultations_for_today, key, False)
+        else:
+            render = lambda: get_template_attribute('_landscape_slides.html', 'lessons_slide')(
+                state.schedule_for_today["landscape_slides"][i], i, key, False)
+        # Содержимое слайда определяется данными дня и его ключом, номер нужен только для id таблиц
+        slides[key] = fragment_cache.get_or_render((schedule_name, "slide", key, i) + state.base, render)
+    return slides
+
+
+def build_view_update(schedule_name: str, state: DisplayState, since: Optional[str], time_info: object) -> dict:
+    """
+    Ответ клиенту, который показывает версию since (общий для /api/view и /api/events):
+    {"changed": false}, если версия актуальна; список появившихся и исчезнувших слайдов,
+    если изменились только видимые слайды того же дня; иначе тело страницы целиком.
+    В каждом ответе - время сервера: по нему клиент подводит часы на экране;
+    при смене версии - и строка звонков для шапки.
+    """
+    server_time = time_info.time_obj.strftime('%H:%M:%S')
+    if since == state.version:
+        return {"changed": False, "version": state.version, "server_time": server_time}
+
+    view = {"changed": True, "version": state.version, "data_version": state.data_version, "server_time": server_time,
+            "bell_status": state.bell_status}
+    previous = display_state.get_previous_state(schedule_name, since) if since else None
+    if display_state.can_patch(previous, state):
+        shown, visible = set(previous.slide_keys), set(state.slide_keys)
+        view["patch"] = {
+            "slides": list(state.slide_keys),
+            "removed": [key for key in previous.slide_keys if key not in visible],
+            "added": render_slides(schedule_name, state, [key for key in state.slide_keys if key not in shown]),
+        }
+    else:
+        view["html"] = render_schedule_body(schedule_name, state)
+    return view
@@ -0,0 +1,38 @@
+# benchmarks/__init__.py
+
+"""
+Бенчмарки производительности. Запускаются из корня репозитория как модули:
+
+    python -m benchmarks.bench_schedule_parser
+
+Конфигурация приложения требует переменных окружения; для бенчмарков подставляются заглушки
+(сеть не используется: книги генерируются локально, см. benchmarks.workbooks).
+"""
+
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("YANDEX_TOKEN", "benchmark")
+os.environ.setdefault("YANDEX_FILE_PATH_1", "/benchmark.xlsx")
+os.environ.setdefault("FILE_NAME_1", "benchmark")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+# Логи парсеров (по строке на лист и обновление) искажали бы замеры
+logging.disable(logging.CRITICAL)
+
+
+def best_of(func, repeat: int = 5, warmup: int = 1) -> float:
+    """Лучшее время одного вызова func() в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
@@ -0,0 +1,44 @@
+# benchmarks/bench_cache_format.py
+
+"""
+Форматы файла кэша (CACHE_FORMAT): размер, запись (dumps) и чтение (loads) содержимого кэша
+для книги на 40 классов и 200 учителей. Проверяется, что оба формата читаются в исходные данные.
+
+    python -m benchmarks.bench_cache_format [--classes 40] [--teachers 200]
+"""
+
+import argparse
+
+from benchmarks import best_of
+from benchmarks.workbooks import cached_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--classes", type=int, default=40)
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from config import Config
+    from app.services.core import cache_manager
+    from app.services.core.api_payloads import compute_content_hash
+    from app.services.core.cache_serializer import get_cache_serializer
+
+    schedule_name = next(iter(Config.SCHEDULES))
+    Config.SCHEDULES[schedule_name]['local_path'] = cached_workbook(
+        "cache", classes=args.classes, teachers=args.teachers)
+    all_data = cache_manager._parse_all_data(schedule_name)
+    all_data["cache_version"] = compute_content_hash(all_data)
+
+    for name in ("json", "binary"):
+        serializer = get_cache_serializer(name)
+        raw = serializer.dumps(all_data)
+        assert serializer.loads(raw) == all_data, f"Формат {name}: данные после чтения отличаются"
+        write_ms = best_of(lambda: serializer.dumps(all_data), repeat=args.repeat)
+        read_ms = best_of(lambda: serializer.loads(raw), repeat=args.repeat)
+        print(f"{name:>6}: {len(raw) / 1024 / 1024:5.2f} MB  запись {write_ms:6.1f} ms  чтение {read_ms:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
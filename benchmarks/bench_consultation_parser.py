@@ -0,0 +1,52 @@
+# benchmarks/bench_consultation_parser.py
+
+"""
+parse_consultations: прежний построчный разбор (benchmarks.legacy.consultation_parser) против текущего
+по колонкам с запоминанием ячеек времени - на листе консультаций из 200 учителей. Текущий замеряется
+дважды: с пустым кэшем ячеек времени (первый разбор книги) и с заполненным (повторные обновления).
+Проверяется, что консультации у обоих совпадают.
+
+    python -m benchmarks.bench_consultation_parser [--teachers 200] [--repeat 5]
+"""
+
+import argparse
+
+from benchmarks import best_of
+from benchmarks.workbooks import cached_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.utils import make_json_serializable
+    from app.services.parsers import consultation_parser
+    from app.services.utils import normalization
+    from app.services.utils.excel_reader import open_workbook
+    from benchmarks.legacy import consultation_parser as legacy
+
+    xls = open_workbook(cached_workbook("consultations", teachers=args.teachers))
+
+    def cold():
+        consultation_parser._split_time_string.cache_clear()
+        normalization.parse_time_str.cache_clear()
+        normalization.clean_room.cache_clear()
+        return consultation_parser.parse_consultations(xls)
+
+    new_consultations = cold()
+    same = make_json_serializable(legacy.parse_consultations(xls)) == make_json_serializable(new_consultations)
+    print(f"Учителей: {args.teachers}, консультаций: {sum(map(len, new_consultations.values()))}, "
+          f"результаты совпадают: {same}")
+
+    legacy_ms = best_of(lambda: legacy.parse_consultations(xls), repeat=args.repeat)
+    cold_ms = best_of(cold, repeat=args.repeat)
+    warm_ms = best_of(lambda: consultation_parser.parse_consultations(xls), repeat=args.repeat)
+    print(f"построчный:            {legacy_ms:6.2f} ms")
+    print(f"по колонкам, холодный: {cold_ms:6.2f} ms  (x{legacy_ms / cold_ms:.1f})")
+    print(f"по колонкам, теплый:   {warm_ms:6.2f} ms  (x{legacy_ms / warm_ms:.1f})")
+
+
+if __name__ == "__main__":
+    main()
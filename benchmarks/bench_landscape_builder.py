@@ -0,0 +1,66 @@
+# benchmarks/bench_landscape_builder.py
+
+"""
+build_landscape_view: прежняя сборка слайдов (benchmarks.legacy.landscape_builder) против текущей
+по индексам - на синтетическом дне, где число букв в параллели и уроков в день растет от x1 до x10.
+Время на урок у текущей сборки должно оставаться примерно постоянным (линейный рост),
+у прежней - расти вместе с числом классов в параллели. Проверяется, что слайды совпадают.
+
+    python -m benchmarks.bench_landscape_builder [--scales 1 2 5 10] [--repeat 3]
+"""
+
+import argparse
+import random
+from datetime import time
+
+from benchmarks import best_of
+
+
+def make_day(scale: int, seed: int = 1) -> list:
+    """Уроки одного дня в обеих сменах: параллели 1-11, до 8 * scale классов и 7 * scale уроков."""
+    from app.services.parsers.common_structs import RawLesson
+    from app.services.utils.enums import Shift
+
+    rnd = random.Random(seed)
+    letters = [f"{letter}{i or ''}" for i in range(scale) for letter in "АБВГДЕЖЗ"]
+    lessons = []
+    for shift in (Shift.FIRST, Shift.SECOND):
+        for grade in range(1, 12):
+            for letter in letters[: (4 + rnd.randint(0, 4)) * scale]:
+                for number in range(1, 7 * scale + 1):
+                    minutes = 8 * 60 + 30 + (number - 1) * 45 + (300 if shift is Shift.SECOND else 0)
+                    start = time(minutes // 60 % 24, minutes % 60)
+                    end = time((minutes + 40) // 60 % 24, (minutes + 40) % 60)
+                    lessons.append(RawLesson(
+                        day_name="Понедельник", class_name=f"{grade} {letter}", shift=shift,
+                        lesson_number=str(number), display_time=f"{start:%H:%M}–{end:%H:%M}",
+                        subject=rnd.choice(["—", "Алгебра", "Физика", "История"]), cabinet=str(rnd.randint(100, 300)),
+                        start_time=f"{start:%H:%M}", end_time=f"{end:%H:%M}", start_time_obj=start, end_time_obj=end
+                    ))
+    rnd.shuffle(lessons)
+    return lessons
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 5, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from app.utils import make_json_serializable
+    from app.services.parsers.landscape_builder import build_landscape_view
+    from benchmarks.legacy import landscape_builder as legacy
+
+    for scale in args.scales:
+        lessons = make_day(scale)
+        same = make_json_serializable(legacy.build_landscape_view(lessons)) == \
+            make_json_serializable(build_landscape_view(lessons))
+        legacy_ms = best_of(lambda: legacy.build_landscape_view(lessons), repeat=args.repeat)
+        new_ms = best_of(lambda: build_landscape_view(lessons), repeat=args.repeat)
+        per_lesson = 1000 / len(lessons)
+        print(f"x{scale:<3} уроков {len(lessons):7d}  прежняя {legacy_ms:8.1f} ms ({legacy_ms * per_lesson:5.2f} мкс/урок)"
+              f"  по индексам {new_ms:7.1f} ms ({new_ms * per_lesson:5.2f} мкс/урок)  совпадает: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_schedule_parser.py
+
+"""
+parse_schedule: прежний разбор через pandas (groupby/iterrows, benchmarks.legacy.schedule_parser)
+против текущего векторного по сетке ячеек - на книге с 40+ классами. Оба замера без чтения файла:
+старому парсеру листы передаются уже прочитанными DataFrame, новому - декодированной сессией книги.
+Проверяется, что уроки у обоих совпадают. Нужен pandas.
+
+    python -m benchmarks.bench_schedule_parser [--classes 16] [--repeat 5]
+"""
+
+import argparse
+
+from benchmarks import best_of
+from benchmarks.workbooks import cached_workbook
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--classes", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    from app.services.parsers.schedule_parser import parse_schedule
+    from app.services.utils.excel_reader import open_workbook
+    from benchmarks.legacy import schedule_parser as legacy
+
+    path = cached_workbook("parser", classes=args.classes)
+    frames = pd.read_excel(path, sheet_name=None, engine="calamine")
+    xls = open_workbook(path)
+
+    new_lessons = parse_schedule(xls)
+    same = legacy.parse_schedule(frames) == new_lessons
+    classes = len({lesson.class_name for lessons in new_lessons.values() for lesson in lessons})
+    print(f"Классов: {classes}, уроков: {sum(map(len, new_lessons.values()))}, результаты совпадают: {same}")
+
+    legacy_ms = best_of(lambda: legacy.parse_schedule(frames), repeat=args.repeat)
+    new_ms = best_of(lambda: parse_schedule(xls), repeat=args.repeat)
+    print(f"pandas/iterrows: {legacy_ms:7.1f} ms")
+    print(f"   векторный:    {new_ms:7.1f} ms  (x{legacy_ms / new_ms:.1f})")
+
+
+if __name__ == "__main__":
+    main()
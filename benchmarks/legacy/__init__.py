@@ -0,0 +1,9 @@
+# benchmarks/legacy/__init__.py
+
+"""
+Прежние реализации горячих мест - точка отсчета для бенчмарков "до/после".
+Код взят из истории без изменений логики; отличаются только входные данные (уже прочитанные листы).
+Вспомогательные функции (data_validator, bell_schedule) тоже взяты из истории - без запоминания
+и поиска по сетке звонков, которые появились позже, иначе "до" считалось бы на нынешних помощниках.
+Приложение эти модули не использует.
+"""
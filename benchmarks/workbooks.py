@@ -0,0 +1,116 @@
+# benchmarks/workbooks.py
+
+"""
+Синтетические книги Excel в формате школьного расписания: листы уроков по сменам,
+лист консультаций и лист сокращенных дней. Генерация детерминирована (seed),
+поэтому одинаковые параметры всегда дают одинаковую книгу.
+Нужен openpyxl (только для генерации; приложение книги им не читает).
+
+    python -m benchmarks.workbooks out.xlsx --classes 40 --teachers 120 --extra-sheets 10
+"""
+
+import argparse
+import os
+import random
+import tempfile
+from datetime import datetime
+
+DAYS = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота"]
+SUBJECTS = ["Математика", "Русский язык", "Физика", "История", "Литература", "Химия", "Биология",
+            "Английский язык", "Информатика", "География"]
+
+
+def make_workbook(path: str, classes: int = 12, teachers: int = 40, extra_sheets: int = 0, seed: int = 1) -> str:
+    """
+    Записывает книгу в path и возвращает путь.
+
+    :param classes: Примерное число классов на листе старшей школы (буквы делятся между параллелями).
+    :param teachers: Число строк на листе консультаций.
+    :param extra_sheets: Дополнительные листы уроков первой смены (для проверки разбора многих листов).
+    """
+    from openpyxl import Workbook
+
+    rnd = random.Random(seed)
+    wb = Workbook()
+    short_days = wb.active
+    short_days.title = "Сокращенные дни"
+    short_days.append(["Дата", "Примечание"])
+    short_days.append([datetime(2026, 10, 20), "Педсовет"])
+    short_days.append(["21.10.2026", "Собрание"])
+
+    def lesson_sheet(title, grades, second_shift=False, lessons_per_day=7):
+        ws = wb.create_sheet(title)
+        header = ["Дни", "Уроки", "Время"]
+        names = []
+        for grade in grades:
+            for letter in "АБВГДЕЖЗИК"[: max(1, classes // len(grades))]:
+                # Половина имен без пробела ('10А'), чтобы проходила нормализация
+                name = f"{grade}{letter}" if rnd.random() < .5 else f"{grade} {letter}"
+                names.append(name)
+                header += [name, "каб" if rnd.random() < .5 else None]
+        ws.append(header)
+        for day in DAYS:
+            for i in range(lessons_per_day):
+                number = i if second_shift else i + 1
+                display = f"{13 + i}.25-{14 + i}.05" if second_shift else f"{8 + i}.30-{9 + i}.10"
+                row = [day if i == 0 else None, number, display]
+                for _ in names:
+                    if rnd.random() < .8:
+                        cabinet = float(rnd.randint(100, 330)) if rnd.random() < .7 else f"{rnd.randint(1, 40)}а"
+                        row += [rnd.choice(SUBJECTS), cabinet]
+                    else:
+                        row += [None, None]
+                ws.append(row)
+
+    lesson_sheet("Нач. школа", [1, 2, 3, 4], lessons_per_day=5)
+    lesson_sheet("5-11 класс (1 смена)", [5, 8, 9, 10, 11])
+    lesson_sheet("6-7 класс (2 смена)", [6, 7], second_shift=True)
+    for k in range(extra_sheets):
+        lesson_sheet(f"{5 + k % 7}-{5 + k % 7} класс (1 смена) {k}", [5 + k % 7])
+
+    ws = wb.create_sheet("Консультации")
+    first, second = ["Учитель"], [None]
+    for day in DAYS:
+        first += [day, None]
+        second += ["Время", "Каб."]
+    ws.append(first)
+    ws.append(second)
+    for col in range(2, 2 + 2 * len(DAYS), 2):
+        ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 1)
+    for t in range(teachers):
+        row = [f"Учитель {t}"]
+        for _ in DAYS:
+            r = rnd.random()
+            if r < .3:
+                row += [f"{rnd.randint(13, 16)}.{rnd.choice(['00', '25', '35'])}-{rnd.randint(14, 17)}:{rnd.choice(['10', '40'])}",
+                        float(rnd.randint(100, 300))]
+            elif r < .5:
+                row += [rnd.choice(["13:25", "14.15", "15:05", "08:30"]), str(rnd.randint(100, 300))]
+            else:
+                row += [None, None]
+        ws.append(row)
+
+    wb.save(path)
+    return path
+
+
+def cached_workbook(name: str, **params) -> str:
+    """Книга с заданными параметрами во временном каталоге: генерируется один раз и переиспользуется."""
+    directory = os.path.join(tempfile.gettempdir(), "schedule-benchmarks")
+    os.makedirs(directory, exist_ok=True)
+    suffix = "-".join(f"{key}{value}" for key, value in sorted(params.items()))
+    path = os.path.join(directory, f"{name}-{suffix}.xlsx" if suffix else f"{name}.xlsx")
+    if not os.path.exists(path):
+        make_workbook(path, **params)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--classes", type=int, default=12)
+    parser.add_argument("--teachers", type=int, default=40)
+    parser.add_argument("--extra-sheets", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(make_workbook(args.path, args.classes, args.teachers, args.extra_sheets, args.seed))
@@ -10,6 +10,7 @@ from config import Config, BASE_DIR
 import os
 
 from app.services.core.cache_manager import get_schedule_data
+from app.services.core.refresh_orchestrator import refresh_all
 
 log = logging.getLogger(__name__)
 
@@ -41,9 +42,21 @@ async def _perform_update(schedule_name: str) -> str:
     """Выполняет обновление кэша и возвращает отформатированную строку с результатом."""
     log.info(f"Выполняется обновление для '{schedule_name}'...")
     result = get_schedule_data(schedule_name, force_update=True)
-    if result.get("error"):
+    return _format_update_result(schedule_name, result.get("error"))
+
+
+async def _perform_update_all() -> list:
+    """Обновляет все расписания параллельно (в отдельных процессах) и возвращает строки с результатами."""
+    log.info("Выполняется обновление всех расписаний...")
+    results = await asyncio.to_thread(refresh_all, list(Config.SCHEDULES.keys()))
+    return [_format_update_result(name, None if success else message)
+            for name, (success, message) in results.items()]
+
+
+def _format_update_result(schedule_name: str, error: str = None) -> str:
+    if error:
         icon = "❌"
-        msg = f"<b>{schedule_name}</b>: Ошибка\n<code>{result['error']}</code>"
+        msg = f"<b>{schedule_name}</b>: Ошибка\n<code>{error}</code>"
     else:
         icon = "✅"
         msg = f"<b>{schedule_name}</b>: Кэш успешно обновлен."
@@ -134,8 +147,7 @@ async def process_update_callback(callback: CallbackQuery):
 
     if schedule_to_update == "__all__":
         await callback.answer("🚀 Начинаю обновление всех расписаний...", show_alert=False)
-        tasks = [_perform_update(name) for name in Config.SCHEDULES.keys()]
-        results = await asyncio.gather(*tasks)
+        results = await _perform_update_all()
         final_message = "✨ <b>Результаты полного обновления:</b>\n\n" + "\n".join(results)
         await callback.message.answer(
             final_message,
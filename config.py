@@ -49,11 +49,37 @@ class Config:
 
     LOGO_FILE_PATH = os.getenv('LOGO_FILE_PATH', 'img/logo.png')
     CACHE_DURATION = int(os.getenv('CACHE_DURATION', 600))
+    # Устаревший кэш отдается сразу, а обновляется в фоне (stale-while-revalidate).
+    # Блокирующее обновление происходит только если кэш старше CACHE_MAX_STALENESS секунд.
+    STALE_WHILE_REVALIDATE = os.getenv('STALE_WHILE_REVALIDATE', 'true').lower() in ('1', 'true', 'yes')
+    CACHE_MAX_STALENESS = int(os.getenv('CACHE_MAX_STALENESS', 3600))
+    # Фоновый планировщик: периодически проверяет все расписания и обновляет их кэш заранее
+    REFRESH_SCHEDULER_ENABLED = os.getenv('REFRESH_SCHEDULER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    REFRESH_INTERVAL = int(os.getenv('REFRESH_INTERVAL', CACHE_DURATION))
+    REFRESH_WORKERS = int(os.getenv('REFRESH_WORKERS', 4))
+    REFRESH_JITTER = int(os.getenv('REFRESH_JITTER', 30))
+    # Сколько процессов параллельно парсят расписания при обновлении всех сразу ("Обновить все", холодный старт)
+    REFRESH_PROCESSES = int(os.getenv('REFRESH_PROCESSES', os.cpu_count() or 1))
     CAROUSEL_INTERVAL = int(os.getenv('CAROUSEL_INTERVAL', 7))
     SHOW_BEFORE_START_MIN = int(os.getenv('SHOW_BEFORE_START_MIN', 75))
     SHOW_AFTER_END_MIN = int(os.getenv('SHOW_AFTER_END_MIN', 30))
     REGION_TIMEDELTA = int(os.getenv('REGION_TIMEDELTA', 7))
     BACKUP_RETENTION_DAYS = int(os.getenv('BACKUP_RETENTION_DAYS', 7))
+    # Сколько декодированных расписаний держать в памяти каждого процесса
+    MEMORY_CACHE_SIZE = int(os.getenv('MEMORY_CACHE_SIZE', 8))
+    # Формат файлов кэша: 'binary' (компактный, по умолчанию) или 'json' (для отладки и выгрузки)
+    CACHE_FORMAT = os.getenv('CACHE_FORMAT', 'binary')
+    # Сколько отрендеренных HTML-фрагментов страницы (тело расписания) держать в памяти процесса
+    FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE', 64))
+    # Как часто экран спрашивает /api/view, изменилось ли показываемое (секунды). Без изменений ответ - несколько байт
+    VIEW_POLL_INTERVAL = int(os.getenv('VIEW_POLL_INTERVAL', 60))
+    # Push-канал для экранов (/api/events, SSE). Каждое подключение держит поток воркера, поэтому канал
+    # включается явно и только при потоковых воркерах Gunicorn (gthread); без него экраны опрашивают /api/view
+    VIEW_EVENTS_ENABLED = os.getenv('VIEW_EVENTS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    # Проверка состояния, heartbeat (секунды) и предел подключений на процесс
+    VIEW_EVENTS_CHECK_INTERVAL = int(os.getenv('VIEW_EVENTS_CHECK_INTERVAL', 5))
+    VIEW_EVENTS_HEARTBEAT = int(os.getenv('VIEW_EVENTS_HEARTBEAT', 15))
+    VIEW_EVENTS_MAX_CLIENTS = int(os.getenv('VIEW_EVENTS_MAX_CLIENTS', 32))
 
     # Проверка, что ключевые переменные загрузились
     if not YANDEX_TOKEN:
@@ -0,0 +1,12 @@
+# run_scheduler.py
+
+import logging
+import sys
+
+from app.services.core.refresh_scheduler import RefreshScheduler
+
+
+if __name__ == '__main__':
+    # Отдельный процесс, который заранее обновляет кэш всех расписаний
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    RefreshScheduler().run_forever()
@@ -0,0 +1,20 @@
+# tests/conftest.py
+
+"""
+Тесты запускаются из корня репозитория: python -m pytest -q
+Конфигурация приложения требует переменных окружения; для тестов подставляются заглушки
+(сеть не используется: книги лежат в tests/fixtures).
+"""
+
+import os
+import sys
+
+os.environ.setdefault("YANDEX_TOKEN", "test")
+os.environ.setdefault("YANDEX_FILE_PATH_1", "/test.xlsx")
+os.environ.setdefault("FILE_NAME_1", "test")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, "tests", "fixtures")
@@ -0,0 +1,90 @@
+# tests/test_bell_schedule.py
+
+"""
+Сетка звонков: поиск идущего и следующего урока, загрузка сеток с листов звонков книги
+и их использование парсерами и шапкой экрана.
+"""
+
+import os
+from datetime import time
+
+from conftest import FIXTURES_DIR
+
+from app.services.utils.enums import DayType, Shift
+from app.services.utils.excel_reader import SheetGrid, open_workbook
+from app.services.utils.bell_schedule import (
+    BellTimetable, TIMETABLES, get_timetable, load_timetables, timetables_to_rows, timetables_from_rows
+)
+from app.services.parsers.schedule_parser import find_schedule_layout, parse_schedule_sheet
+from app.services.core.view_filter import describe_bells
+
+
+class _Workbook:
+    """Книга из готовых листов: load_timetables нужны только sheet_names и sheet()."""
+
+    def __init__(self, *grids: SheetGrid):
+        self._grids = {grid.name: grid for grid in grids}
+        self.sheet_names = list(self._grids)
+
+    def sheet(self, sheet_name: str) -> SheetGrid:
+        return self._grids[sheet_name]
+
+
+def _bell_sheet(name: str) -> SheetGrid:
+    return SheetGrid(name, [["Урок", "Начало", "Конец"], [1, "9.00", "9.45"], [2, time(9, 55), time(10, 40)],
+                            ["", "", ""], [3, "10.50", "11.35"]])
+
+
+def test_current_and_next_lesson():
+    timetable = get_timetable(Shift.FIRST, DayType.NORMAL)
+    number = lambda lesson: lesson.number if lesson else None
+    # Начало урока включительно, конец - нет; на перемене идущего урока нет
+    assert [number(l) for l in timetable.current_and_next(time(8, 0))] == [None, 1]
+    assert [number(l) for l in timetable.current_and_next(time(8, 30))] == [1, 2]
+    assert [number(l) for l in timetable.current_and_next(time(9, 10))] == [None, 2]
+    assert [number(l) for l in timetable.current_and_next(time(16, 34))] == [10, None]
+    assert [number(l) for l in timetable.current_and_next(time(16, 35))] == [None, None]
+
+
+def test_timetable_from_grid():
+    by_columns = BellTimetable.from_grid(_bell_sheet("Звонки"))
+    by_range = BellTimetable.from_grid(SheetGrid("Звонки", [["№", "Время"], [1, "9.00-9.45"], [2, "9.55–10.40"]]))
+    assert [(l.number, l.start_time, l.end_time) for l in by_columns.lessons] == [
+        (1, "9:00", "9:45"), (2, "9:55", "10:40"), (3, "10:50", "11:35")]
+    assert by_range.lessons == by_columns.lessons[:2]
+    assert not BellTimetable.from_grid(SheetGrid("Звонки", [["Начало", "Конец"], ["9.00", "9.45"]]))
+
+
+def test_load_timetables_from_bell_sheets():
+    assert load_timetables(_Workbook(SheetGrid("Лист", [["Дни"]]))) is TIMETABLES
+
+    timetables = load_timetables(_Workbook(_bell_sheet("Звонки (2 смена) (сокр)"), _bell_sheet("Звонки")))
+    assert timetables[DayType.SHORT][Shift.SECOND].by_number(2).start_time == "9:55"
+    assert timetables[DayType.NORMAL][Shift.FIRST].by_number(1).end_time == "9:45"
+    # Остальные сетки - встроенные, сам TIMETABLES не меняется
+    assert timetables[DayType.SHORT][Shift.FIRST] is TIMETABLES[DayType.SHORT][Shift.FIRST]
+    assert TIMETABLES[DayType.NORMAL][Shift.FIRST].by_number(1).start_time == "8:30"
+
+    restored = timetables_from_rows(timetables_to_rows(timetables))
+    assert restored[DayType.SHORT][Shift.SECOND].lessons == timetables[DayType.SHORT][Shift.SECOND].lessons
+
+
+def test_parser_uses_workbook_bells():
+    grid = open_workbook(os.path.join(FIXTURES_DIR, "schedule.xlsx")).sheet("5-11 класс (1 смена)")
+    layout = find_schedule_layout(grid)
+    timetables = load_timetables(_Workbook(_bell_sheet("Звонки (1 смена)")))
+
+    default = parse_schedule_sheet(grid, layout, DayType.NORMAL)
+    custom = parse_schedule_sheet(grid, layout, DayType.NORMAL, timetables)
+    first_lessons = [l for lessons in custom.values() for l in lessons if l.lesson_number == "1"]
+    assert first_lessons and all(l.display_time == "9:00–9:45" and l.end_time_obj == time(9, 45)
+                                 for l in first_lessons)
+    assert [l.subject for l in sum(custom.values(), [])] == [l.subject for l in sum(default.values(), [])]
+
+
+def test_describe_bells():
+    day_bells = {shift: get_timetable(shift, DayType.NORMAL) for shift in Shift}
+    assert describe_bells(day_bells, time(10, 0)) == "1 смена: 3 урок в 10:05 · 2 смена: 0 урок в 12:35"
+    assert describe_bells(day_bells, time(12, 40)) == ("1 смена: идет 6 урок до 13:15 · "
+                                                       "2 смена: идет 0 урок до 13:15")
+    assert describe_bells(day_bells, time(19, 0)) == ""
@@ -0,0 +1,115 @@
+# tests/test_parser_equivalence.py
+
+"""
+Оптимизации разбора не должны менять результат.
+
+Книги в tests/fixtures сгенерированы benchmarks.workbooks (classes=8, teachers=24, extra_sheets=1);
+в schedule_changed.xlsx по сравнению со schedule.xlsx изменены одна ячейка урока на листе
+"6-7 класс (2 смена)" и одна консультация. Файлы *_expected.json - отпечатки (sha256 JSON)
+уроков, консультаций и представлений каждого дня, снятые парсерами до перевода записей
+на slots и общие строки; отпечатки консультаций сокращенного дня сняты заново, когда вернули
+консультации, начало которых есть только в обычной сетке звонков. Если формат результата
+меняется намеренно, отпечатки нужно снять заново.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import pytest
+
+from conftest import FIXTURES_DIR
+
+from app.utils import make_json_serializable
+from app.services.utils.enums import DayType
+from app.services.utils.excel_reader import open_workbook
+from app.services.core import incremental_parser
+from app.services.parsers.schedule_parser import parse_schedule
+from app.services.parsers.consultation_parser import parse_consultations
+from app.services.parsers.portrait_builder import build_portrait_view
+from app.services.parsers.landscape_builder import build_landscape_view
+
+WORKBOOKS = ("schedule", "schedule_changed")
+DAY_TYPES = (DayType.NORMAL, DayType.SHORT)
+
+
+def _workbook(name: str):
+    return open_workbook(os.path.join(FIXTURES_DIR, f"{name}.xlsx"))
+
+
+def _digest(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, ensure_ascii=False, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _snapshot(xls) -> dict:
+    """Отпечатки результата по сетке звонков, разделу и дню - в формате *_expected.json."""
+    snapshot = {}
+    for day_type in DAY_TYPES:
+        lessons = parse_schedule(xls, day_type)
+        sections = make_json_serializable({
+            "lessons": lessons,
+            "consultations": parse_consultations(xls, day_type),
+            "portrait": {day: build_portrait_view(day_lessons) for day, day_lessons in lessons.items()},
+            "landscape": {day: build_landscape_view(day_lessons) for day, day_lessons in lessons.items()},
+        })
+        snapshot[day_type.name] = {section: {day: _digest(value) for day, value in by_day.items()}
+                                   for section, by_day in sections.items()}
+    return snapshot
+
+
+@pytest.mark.parametrize("name", WORKBOOKS)
+def test_parse_matches_reference(name):
+    with open(os.path.join(FIXTURES_DIR, f"{name}_expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+    assert _snapshot(_workbook(name)) == expected
+
+
+def test_incremental_matches_full_parse(monkeypatch):
+    parsed_sheets = []
+    parse_sheet = incremental_parser.parse_schedule_sheet_variants
+
+    def counting_parse_sheet(grid, *args):
+        parsed_sheets[-1].append(grid.name)
+        return parse_sheet(grid, *args)
+
+    monkeypatch.setattr(incremental_parser, "parse_schedule_sheet_variants", counting_parse_sheet)
+
+    # Одно и то же имя расписания: второй разбор видит результаты первого
+    for name in WORKBOOKS:
+        parsed_sheets.append([])
+        xls = _workbook(name)
+        variants = incremental_parser.parse_schedule_incremental("equivalence", xls, DAY_TYPES)
+        consultation_variants = incremental_parser.parse_consultations_incremental("equivalence", xls, DAY_TYPES)
+        for day_type in DAY_TYPES:
+            assert variants[day_type] == parse_schedule(xls, day_type)
+            assert consultation_variants[day_type] == parse_consultations(xls, day_type)
+
+    # Во второй книге изменился один лист уроков - только он и разобран заново
+    assert len(parsed_sheets[0]) > 1
+    assert parsed_sheets[1] == ["6-7 класс (2 смена)"]
+
+
+def test_sheet_results_survive_process_hop(monkeypatch):
+    # Так результаты разбора листов ходят в процесс пула обновления и обратно (refresh_orchestrator)
+    xls = _workbook("schedule")
+    expected = incremental_parser.parse_schedule_incremental("pooled", xls, DAY_TYPES)
+    entries = pickle.loads(pickle.dumps(incremental_parser.export_sheet_results("pooled")))
+    assert entries and all(key[0] == "pooled" for key, _, _ in entries)
+    for key, _, _ in entries:
+        incremental_parser._sheet_results.pop(key)
+
+    incremental_parser.import_sheet_results(entries)
+    monkeypatch.setattr(incremental_parser, "parse_schedule_sheet_variants",
+                        lambda *args: pytest.fail("лист разобран заново"))
+    assert incremental_parser.parse_schedule_incremental("pooled", xls, DAY_TYPES) == expected
+
+
+@pytest.mark.parametrize("name", WORKBOOKS)
+def test_short_day_keeps_all_consultations(name):
+    # Начала консультаций, которых нет в сокращенной сетке, не должны теряться
+    xls = _workbook(name)
+    normal = parse_consultations(xls, DayType.NORMAL)
+    short = parse_consultations(xls, DayType.SHORT)
+    assert {day: len(items) for day, items in short.items()} == {day: len(items) for day, items in normal.items()}
+